@@ -5,13 +5,15 @@ Autonomous Agent
 Main orchestrator for autonomous software development.
 """
 
+import fnmatch
+import functools
 import os
 import re
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Set, FrozenSet, Iterator, Tuple
 
-from coding_tool import CodingTool, OpenCodeCodingTool, ClaudeCodingTool
+from coding_tool import CodingTool, OpenCodeCodingTool, ClaudeCodingTool, CachingCodingTool
 from task_manager import TaskManager
 from executor import Executor
 from git_manager import GitManager
@@ -24,6 +26,21 @@ from background_manager import BackgroundManager
 from rollback_manager import RollbackManager
 
 
+_FILE_BLOCK_RE = re.compile(r"FILE:\s*(.*?)\n```(?:\w+)?\n(.*?)\n```", re.DOTALL)
+_KEYWORD_RE = re.compile(r"[a-z_][a-z0-9_]{3,}")
+
+_EXCLUDE_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv", "venv", "build", "dist",
+                           ".agent_cache"})
+_EXCLUDE_FILES = frozenset({"tasks.json", "requirements.txt", ".env", "tasks.lock"})
+
+_BREAKDOWN_SYSTEM_PROMPT = "You are a task breakdown specialist. Return only valid JSON."
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_file_patterns(patterns: Tuple[str, ...]) -> "re.Pattern":
+    """Fold glob patterns into one regex so each path is matched in a single call."""
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
 
 class AutonomousAgent:
     """Configurable autonomous agent for various task types."""
@@ -49,6 +66,12 @@ class AutonomousAgent:
         self.rollback_manager = RollbackManager(str(project_dir))
         self.refiner = TaskRefiner(self.coding_tool, self.config)
 
+        # rel_path -> (mtime_ns, size, content); files are only re-read when their stat changes.
+        # Binary files are cached with content None so they are not re-read either.
+        self._file_cache: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        self._file_keywords: Dict[str, FrozenSet[str]] = {}
+        self._last_changed_files: Set[str] = set()
+
     def parse_files_from_response(self, response: str) -> dict:
         """
         Parse file changes from AI response.
@@ -60,10 +83,8 @@ class AutonomousAgent:
             Dictionary mapping file paths to content
         """
         files = {}
-        pattern = r"FILE:\s*(.*?)\n```(?:\w+)?\n(.*?)\n```"
-        matches = re.findall(pattern, response, re.DOTALL)
-        for path, content in matches:
-            path = path.strip()
+        for match in _FILE_BLOCK_RE.finditer(response):
+            path, content = match.group(1).strip(), match.group(2)
             path_obj = Path(path)
             if path_obj.is_absolute():
                 try:
@@ -77,33 +98,160 @@ class AutonomousAgent:
         """
         Get current codebase context filtered by domain patterns.
 
+        File contents are cached by (mtime, size), so only files that changed
+        since the previous call are read from disk again.
+
         Returns:
             String containing all file contents
         """
-        file_context = ""
-        exclude_dirs = {".git", "node_modules", "__pycache__", ".venv", "venv", "build", "dist"}
-        exclude_files = {"tasks.json", "requirements.txt", ".env", "tasks.lock"}
+        return "".join(self._format_file(rel_path) for rel_path in self._scan_files())
 
-        for root, dirs, files in os.walk(self.project_dir):
-            # Filter directories
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
+    def _scan_files(self) -> List[str]:
+        """
+        Walk the project and refresh the file content cache.
 
-            for file in files:
-                if file in exclude_files:
-                    continue
+        Returns:
+            Relative paths of all included files, in walk order
+        """
+        paths = []
+        seen = set()
+        for rel_path, entry in self._iter_files():
+            # Check if file matches domain patterns
+            if not self._should_include_file(entry.path, rel_path):
+                continue
+
+            try:
+                st = entry.stat()
+                cached = self._file_cache.get(rel_path)
+                if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+                    with open(entry.path, "rb") as f:
+                        data = f.read()
+                    # A NUL byte near the start is a cheap, reliable sign of a binary file
+                    content = None if b"\x00" in data[:1024] else data.decode("utf-8", "replace")
+                    cached = (st.st_mtime_ns, st.st_size, content)
+                    self._file_cache[rel_path] = cached
+                    self._file_keywords.pop(rel_path, None)
+            except Exception:
+                continue
+
+            seen.add(rel_path)
+            if cached[2] is not None:
+                paths.append(rel_path)
+
+        # Drop entries for files that were deleted since the last walk
+        for rel_path in self._file_cache.keys() - seen:
+            self._invalidate_file(rel_path)
+
+        return paths
+
+    def _iter_files(self) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Walk the project with os.scandir, pruning excluded and git-ignored directories.
 
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.project_dir)
+        Yields:
+            (relative POSIX path, DirEntry) for every candidate file
+        """
+        stack = [(str(self.project_dir), "")]
+        while stack:
+            dir_path, prefix = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+
+            for entry in entries:
+                rel_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _EXCLUDE_DIRS and not self._is_ignored(rel_path + "/"):
+                        stack.append((entry.path, rel_path + "/"))
+                elif (entry.name not in _EXCLUDE_FILES and entry.is_file()
+                      and not self._is_ignored(rel_path)):
+                    yield rel_path, entry
+
+    def _is_ignored(self, rel_path: str) -> bool:
+        """Check a path against .gitignore, treating git errors as not ignored."""
+        try:
+            return self.git_manager.is_ignored(rel_path)
+        except Exception:
+            return False
 
-                # Check if file matches domain patterns
-                if self._should_include_file(file_path, rel_path):
-                    try:
-                        with open(file_path, "r", encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            file_context += f"\nFILE: {rel_path}\n---\n{content}\n---\n"
-                    except Exception:
-                        pass
-        return file_context
+    def _format_file(self, rel_path: str) -> str:
+        """Render a cached file as a FILE block for prompts."""
+        return f"\nFILE: {rel_path}\n---\n{self._file_cache[rel_path][2]}\n---\n"
+
+    def _invalidate_file(self, rel_path: str):
+        """Forget cached content for a file so the next walk re-reads it."""
+        self._file_cache.pop(rel_path, None)
+        self._file_keywords.pop(rel_path, None)
+
+    def _relevant_files(self, task: SubTask) -> List[str]:
+        """
+        Order project files by relevance to a task.
+
+        Files named in the task come first, then files written by the previous
+        attempt, then the rest ranked by how many task keywords they contain.
+
+        Args:
+            task: Task about to be executed
+
+        Returns:
+            Relative paths of all included files, most relevant first
+        """
+        task_text = f"{task.title}\n{task.description}\n{task.test_command}"
+        task_keywords = set(_KEYWORD_RE.findall(task_text.lower()))
+
+        mentioned, recent, ranked = [], [], []
+        for index, rel_path in enumerate(self._scan_files()):
+            basename = os.path.basename(rel_path)
+            if rel_path in task_text or (len(basename) > 2 and basename in task_text):
+                mentioned.append(rel_path)
+            elif rel_path in self._last_changed_files:
+                recent.append(rel_path)
+            else:
+                keywords = self._file_keywords.get(rel_path)
+                if keywords is None:
+                    text = f"{rel_path}\n{self._file_cache[rel_path][2]}".lower()
+                    keywords = frozenset(_KEYWORD_RE.findall(text))
+                    self._file_keywords[rel_path] = keywords
+                ranked.append((-len(task_keywords & keywords), index, rel_path))
+
+        ranked.sort()
+        return mentioned + recent + [rel_path for _, _, rel_path in ranked]
+
+    def _build_context(self, paths: List[str]) -> str:
+        """
+        Render FILE blocks for the most relevant paths within config.max_context_chars.
+
+        Relevance only decides which files fit; the chosen blocks are rendered
+        in path order, so the same selection always produces the same text.
+        Files are never truncated, since the coder rewrites files in full and
+        would lose whatever it did not see. Files that do not fit are listed
+        by name instead. The first file is always included.
+
+        Args:
+            paths: Relative paths, most relevant first
+
+        Returns:
+            Codebase context string
+        """
+        budget = self.config.max_context_chars
+        blocks = {}
+        omitted = []
+        used = 0
+        for rel_path in paths:
+            block = self._format_file(rel_path)
+            if budget and blocks and used + len(block) > budget:
+                omitted.append(rel_path)
+                continue
+            blocks[rel_path] = block
+            used += len(block)
+
+        parts = [blocks[rel_path] for rel_path in sorted(blocks)]
+        if omitted:
+            parts.append("\nOther files (not shown to save space):\n")
+            parts.append("".join(f"- {rel_path}\n" for rel_path in sorted(omitted)))
+        return "".join(parts)
 
     def _should_include_file(self, file_path: str, rel_path: str) -> bool:
         """
@@ -116,17 +264,11 @@ class AutonomousAgent:
         Returns:
             True if file should be included
         """
-        import fnmatch
-
         if not self.config or not self.config.file_patterns:
             return True
 
-        for pattern in self.config.file_patterns:
-            if fnmatch.fnmatch(rel_path, pattern):
-                return True
-            if fnmatch.fnmatch(os.path.basename(file_path), pattern):
-                return True
-        return False
+        pattern_re = _compile_file_patterns(tuple(self.config.file_patterns))
+        return bool(pattern_re.match(rel_path) or pattern_re.match(os.path.basename(file_path)))
 
     def plan(self):
         """Plan tasks from the requirement using domain-specific configuration."""
@@ -226,10 +368,13 @@ class AutonomousAgent:
                 print(f"\n--- Processing Task [{task.id}] (Attempt {attempt + 1}/{max_retries}): {task.title} ---")
                 self.task_manager.update_task_status(task.id, "in_progress")
 
-                # Get context and add retry modifier if this is a retry
-                file_context = self.get_file_context()
-                context = f"Subtask: {task.description}\nTest Command: {task.test_command}\n"
-                context += f"\nCurrent codebase:\n{file_context}\n"
+                # Get context and add retry modifier if this is a retry.
+                # The codebase goes first and is rendered in path order, so while the
+                # files and the selection are unchanged it is an identical prefix that
+                # providers with prompt prefix caching can reuse.
+                file_context = self._build_context(self._relevant_files(task))
+                context = f"Current codebase:\n{file_context}\n"
+                context += f"\nSubtask: {task.description}\nTest Command: {task.test_command}\n"
 
                 # Add retry context if this is a retry attempt within the current run
                 if attempt > 0:
@@ -287,13 +432,7 @@ class AutonomousAgent:
                 files_to_write = self.parse_files_from_response(coder_response)
                 changed_files = []
                 if files_to_write:
-                    for path, content in files_to_write.items():
-                        full_path = self.project_dir / path
-                        full_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(full_path, "w") as f:
-                            f.write(content)
-                        changed_files.append(path)
-                        print(f"Wrote {path}")
+                    changed_files = self._write_files(files_to_write)
                 else:
                     print("No file changes provided.")
 
@@ -309,8 +448,8 @@ class AutonomousAgent:
                 result_context = f"Task '{task.title}' " + ("passed" if exit_code == 0 else "failed")
                 result_context += f"\nOutput:\n{output}"
 
-                error_patterns = ['error', 'Error', 'ERROR', 'failed', 'Failed', 'FAILED', 'exception', 'Exception', 'EXCEPTION']
-                has_error = any(pattern in output for pattern in error_patterns)
+                lowered = output.lower()
+                has_error = "error" in lowered or "failed" in lowered or "exception" in lowered
 
                 if has_error and exit_code == 0:
                     print("Warning: Output contains error patterns despite exit code 0")
@@ -355,6 +494,36 @@ class AutonomousAgent:
 
         return False
 
+    def _write_files(self, files: Dict[str, str]) -> List[str]:
+        """
+        Write files parsed from a coder response.
+
+        Parent directories are created first; the writes then run on a small
+        thread pool so they overlap on slow or networked filesystems.
+
+        Args:
+            files: Mapping of relative file paths to content
+
+        Returns:
+            List of written file paths
+        """
+        full_paths = {path: self.project_dir / path for path in files}
+        for parent in {full_path.parent for full_path in full_paths.values()}:
+            parent.mkdir(parents=True, exist_ok=True)
+
+        def _write(item: Tuple[str, str]):
+            path, content = item
+            full_paths[path].write_bytes(content.encode("utf-8"))
+
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+            list(pool.map(_write, files.items()))
+
+        for path in files:
+            self._invalidate_file(Path(path).as_posix())
+            print(f"Wrote {path}")
+        self._last_changed_files = {Path(path).as_posix() for path in files}
+        return list(files)
+
     def _commit_task_changes(self, task: SubTask, changed_files: List[str]):
         """
         Commit changes with task checkpoint format.
@@ -405,7 +574,7 @@ Return ONLY a JSON object with a 'tasks' array containing the new subtasks."""
 
             breakdown_response = self.coding_tool.query_json(
                 breakdown_context,
-                system_instruction="You are a task breakdown specialist. Return only valid JSON."
+                system_instruction=_BREAKDOWN_SYSTEM_PROMPT
             )
 
             if "tasks" in breakdown_response:
@@ -440,10 +609,7 @@ Return ONLY a JSON object with a 'tasks' array containing the new subtasks."""
             last_task_id=task.id
         )
 
-        old_tasks_repr = json.dumps(current_tasks_dict, sort_keys=True)
-        new_tasks_repr = json.dumps(updated_tasks, sort_keys=True)
-
-        if old_tasks_repr != new_tasks_repr:
+        if updated_tasks != current_tasks_dict:
             self.task_manager.set_tasks(updated_tasks)
             print(f"Task list updated. Total tasks: {len(self.task_manager.tasks)}")
 
@@ -454,7 +620,8 @@ def autonomous_coding(
     recover: bool = False,
     max_tasks: Optional[int] = None,
     config_name: Optional[str] = None,
-    tool: Optional[str] = None
+    tool: Optional[str] = None,
+    use_cache: bool = True
 ):
     """
     Fully autonomous software development from requirement to completion.
@@ -466,6 +633,7 @@ def autonomous_coding(
         max_tasks: Maximum number of tasks to execute
         config_name: Name of configuration to use (e.g., 'coding', 'harmonyos')
         tool: Coding tool to use ('opencode' or 'claude', default: 'opencode')
+        use_cache: Whether to replay cached responses for repeated prompts
     """
     project_path = Path(project_dir).resolve()
 
@@ -476,6 +644,9 @@ def autonomous_coding(
     else:
         coding_tool = OpenCodeCodingTool()
 
+    if use_cache:
+        coding_tool = CachingCodingTool(coding_tool, project_path / ".agent_cache")
+
     # Load configuration
     config = None
     if config_name:
@@ -489,17 +660,18 @@ def autonomous_coding(
     else:
         config = ConfigRegistry.get('coding')
 
-    agent = AutonomousAgent(
-        requirement=requirement,
-        project_dir=project_path,
-        coding_tool=coding_tool,
-        config=config
-    )
+    with coding_tool:
+        agent = AutonomousAgent(
+            requirement=requirement,
+            project_dir=project_path,
+            coding_tool=coding_tool,
+            config=config
+        )
 
-    if requirement and not recover:
-        agent.plan()
+        if requirement and not recover:
+            agent.plan()
 
-    if max_tasks:
-        agent.run(max_tasks=max_tasks, timeout=300)
-    else:
-        agent.run(timeout=300)
+        if max_tasks:
+            agent.run(max_tasks=max_tasks, timeout=300)
+        else:
+            agent.run(timeout=300)
@@ -40,6 +40,8 @@ Examples:
     parser.add_argument("--config", "-c", default=None, help="Configuration name (e.g., 'coding', 'harmonyos')")
     parser.add_argument("--tool", "-t", default=None, choices=["opencode", "claude"],
                         help="Coding tool to use: 'opencode' (default) or 'claude' (requires ANTHROPIC_API_KEY)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always query the coding tool instead of replaying cached responses")
 
     # Rollback subcommand
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
@@ -86,7 +88,8 @@ Examples:
         recover=args.recover,
         max_tasks=args.max_tasks,
         config_name=args.config,
-        tool=args.tool
+        tool=args.tool,
+        use_cache=not args.no_cache
     )
 
 
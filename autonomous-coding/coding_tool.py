@@ -5,9 +5,45 @@ Coding Tool Interface
 Abstract base class for AI coding tools and implementations.
 """
 
+import copy
+import functools
+import hashlib
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import json_codec
+
+
+_JSON_INSTRUCTION = b"\n\nIMPORTANT: Return ONLY the JSON object requested."
+
+# Failures worth another attempt. Timeouts are deliberately absent: the caller
+# already waited the full timeout, and a missing CLI (FileNotFoundError) will not
+# appear between attempts.
+_TRANSIENT_ERRORS = (ConnectionError,)
+_MAX_BACKOFF_SECONDS = 30
+
+T = TypeVar("T")
+
+
+class CodingToolError(Exception):
+    """Raised when the coding tool CLI exits with an error."""
+
+
+@functools.lru_cache(maxsize=32)
+def _encode_system_prefix(system_instruction: str) -> bytes:
+    """Encode a system instruction and its separator once; they repeat on every call."""
+    return f"{system_instruction}\n\nTask:\n".encode()
+
+
+def _parse_json_response(response_text: str) -> dict:
+    """Parse the outermost JSON object in a response, ignoring any surrounding prose."""
+    start = response_text.find('{')
+    end = response_text.rfind('}') + 1
+    if start != -1 and end > start:
+        return json_codec.loads(response_text[start:end])
+    return json_codec.loads(response_text)
 
 
 class CodingTool(ABC):
@@ -47,6 +83,43 @@ class CodingTool(ABC):
         """
         pass
 
+    def _with_retries(self, call: Callable[[], T], retries: int, json_response: bool = False) -> T:
+        """
+        Call a query function, retrying transient failures with exponential backoff.
+
+        Args:
+            call: Zero-argument function performing one query attempt
+            retries: Total number of attempts (at least one is always made)
+            json_response: Also retry responses that fail to parse as JSON
+
+        Returns:
+            Result of the first successful attempt
+        """
+        retry_on = _TRANSIENT_ERRORS + (CodingToolError,)
+        if json_response:
+            retry_on += (ValueError,)
+
+        attempts = max(1, retries)
+        for attempt in range(attempts):
+            try:
+                return call()
+            except retry_on as e:
+                if attempt == attempts - 1:
+                    raise
+                wait = min(_MAX_BACKOFF_SECONDS, 0.5 * 2 ** attempt)
+                print(f"Query attempt {attempt + 1}/{attempts} failed ({e}), retrying in {wait:g}s")
+                time.sleep(wait)
+
+    def close(self):
+        """Release any long-lived resources held by the tool."""
+        pass
+
+    def __enter__(self) -> "CodingTool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 class ClaudeCodingTool(CodingTool):
     """Claude Code CLI tool — runs `claude --dangerously-skip-permissions -p <prompt>`."""
@@ -56,7 +129,8 @@ class ClaudeCodingTool(CodingTool):
     def __init__(self, model: Optional[str] = None):
         self.model = model or self.DEFAULT_MODEL
 
-    def _run_claude(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+    def _run_claude(self, prompt: str, system_instruction: Optional[str] = None,
+                    timeout: Optional[int] = None) -> str:
         """Run Claude Code CLI in non-interactive print mode."""
         import subprocess
         cmd = [
@@ -69,122 +143,235 @@ class ClaudeCodingTool(CodingTool):
         if self.model:
             cmd += ["--model", self.model]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Query timed out after {timeout} seconds")
         if result.returncode != 0:
-            raise Exception(f"Claude CLI failed: {result.stderr or result.stdout}")
+            raise CodingToolError(f"Claude CLI failed: {result.stderr or result.stdout}")
         return result.stdout
 
     def query(self, prompt: str, system_instruction: Optional[str] = None,
               retries: int = 3, timeout: Optional[int] = None) -> str:
         """Run a subtask through Claude Code CLI."""
-        def _query_internal():
-            return self._run_claude(prompt, system_instruction)
-
-        if timeout is None:
-            return _query_internal()
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_query_internal)
-            try:
-                return future.result(timeout=timeout)
-            except FuturesTimeoutError:
-                future.cancel()
-                raise TimeoutError(f"Query timed out after {timeout} seconds")
+        return self._with_retries(lambda: self._run_claude(prompt, system_instruction, timeout), retries)
 
     def query_json(self, prompt: str, system_instruction: Optional[str] = None,
                    retries: int = 3, timeout: Optional[int] = None) -> dict:
         """Run a subtask through Claude Code CLI and parse the JSON response."""
-        import json
-
         json_prompt = prompt + "\n\nIMPORTANT: Return ONLY the JSON object requested, no markdown fencing."
 
-        def _query_json_internal():
-            response_text = self._run_claude(json_prompt, system_instruction)
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response_text[start:end])
-            return json.loads(response_text)
+        return self._with_retries(
+            lambda: _parse_json_response(self._run_claude(json_prompt, system_instruction, timeout)),
+            retries,
+            json_response=True
+        )
+
+
+class OpenCodeCodingTool(CodingTool):
+    """
+    OpenCode AI coding tool using opencode CLI.
+
+    Used as a context manager, it keeps one `opencode serve` process alive and
+    attaches each `opencode run` to it, so the server and model client start
+    once rather than on every query. Without a running server each query
+    starts opencode from scratch.
+    """
+
+    SERVER_START_TIMEOUT = 30
+
+    def __init__(self, persistent: bool = True):
+        self.persistent = persistent
+        self._server = None
+        self._server_url: Optional[str] = None
+
+    def __enter__(self) -> "OpenCodeCodingTool":
+        if self.persistent and self._server is None:
+            self._start_server()
+        return self
 
-        if timeout is None:
-            return _query_json_internal()
+    def _start_server(self):
+        """Start `opencode serve` on a free local port and wait until it accepts connections."""
+        import socket
+        import subprocess
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        try:
+            self._server = subprocess.Popen(
+                ["opencode", "serve", "--hostname", "127.0.0.1", "--port", str(port)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            print(f"Warning: could not start opencode server, running cold: {e}")
+            return
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_query_json_internal)
+        deadline = time.monotonic() + self.SERVER_START_TIMEOUT
+        while time.monotonic() < deadline and self._server.poll() is None:
             try:
-                return future.result(timeout=timeout)
-            except FuturesTimeoutError:
-                future.cancel()
-                raise TimeoutError(f"Query timed out after {timeout} seconds")
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            except OSError:
+                time.sleep(0.1)
+                continue
+            self._server_url = f"http://127.0.0.1:{port}"
+            return
 
+        print("Warning: opencode server did not start, running cold")
+        self.close()
 
-class OpenCodeCodingTool(CodingTool):
-    """OpenCode AI coding tool using opencode CLI."""
-    
-    def __init__(self):
-        pass
-    
-    def _run_opencode(self, prompt: str) -> str:
-        """Run opencode CLI."""
+    def close(self):
+        """Stop the persistent opencode server, if one is running."""
         import subprocess
-        result = subprocess.run(
-            ["opencode", "run"],
-            input=prompt,
-            capture_output=True,
-            text=True
-        )
+
+        server, self._server, self._server_url = self._server, None, None
+        if server is None or server.poll() is not None:
+            return
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    def _run_opencode(self, prompt: bytes, timeout: Optional[int] = None) -> str:
+        """Run opencode CLI, killing it if it exceeds the timeout."""
+        import subprocess
+        if self._server is not None and self._server.poll() is not None:
+            # The server died mid-run; restarting it falls back to cold runs if that fails too
+            print("Warning: opencode server exited, restarting it")
+            self.close()
+            self._start_server()
+        command = ["opencode", "run"]
+        if self._server_url:
+            command += ["--attach", self._server_url]
+        try:
+            result = subprocess.run(
+                command,
+                input=prompt,
+                capture_output=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Query timed out after {timeout} seconds")
+        stdout = result.stdout.decode("utf-8", "replace")
         if result.returncode != 0:
-            raise Exception(f"OpenCode failed: {result.stderr or result.stdout}")
-        return result.stdout
-    
+            raise CodingToolError(f"OpenCode failed: {result.stderr.decode('utf-8', 'replace') or stdout}")
+        return stdout
+
+    def _build_prompt(self, prompt: str, system_instruction: Optional[str],
+                      suffix: bytes = b"") -> bytes:
+        """Encode the full prompt for opencode's stdin without building it as a str first."""
+        if not system_instruction:
+            return prompt.encode() + suffix
+        return b"".join((_encode_system_prefix(system_instruction), prompt.encode(), suffix))
+
     def query(self, prompt: str, system_instruction: Optional[str] = None,
               retries: int = 3, timeout: Optional[int] = None) -> str:
         """Query OpenCode AI."""
-        def _query_internal():
-            full_prompt = prompt
-            if system_instruction:
-                full_prompt = f"{system_instruction}\n\nTask:\n{prompt}"
-            
-            return self._run_opencode(full_prompt)
-        
-        if timeout is None:
-            return _query_internal()
-        
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_query_internal)
-            try:
-                return future.result(timeout=timeout)
-            except FuturesTimeoutError:
-                future.cancel()
-                raise TimeoutError(f"Query timed out after {timeout} seconds")
+        full_prompt = self._build_prompt(prompt, system_instruction)
+        return self._with_retries(lambda: self._run_opencode(full_prompt, timeout), retries)
     
     def query_json(self, prompt: str, system_instruction: Optional[str] = None,
                  retries: int = 3, timeout: Optional[int] = None) -> dict:
         """Query OpenCode AI and expect JSON response."""
-        import json
-        
-        def _query_json_internal():
-            full_prompt = prompt
-            if system_instruction:
-                full_prompt = f"{system_instruction}\n\nTask:\n{prompt}"
-            
-            full_prompt += "\n\nIMPORTANT: Return ONLY the JSON object requested."
-            
-            response_text = self._run_opencode(full_prompt)
-            
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            if start != -1 and end != 0:
-                return json.loads(response_text[start:end])
-            return json.loads(response_text)
-        
-        if timeout is None:
-            return _query_json_internal()
-        
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_query_json_internal)
+        full_prompt = self._build_prompt(prompt, system_instruction, _JSON_INSTRUCTION)
+        return self._with_retries(
+            lambda: _parse_json_response(self._run_opencode(full_prompt, timeout)),
+            retries,
+            json_response=True
+        )
+
+
+class CachingCodingTool(CodingTool):
+    """
+    Wraps another CodingTool and replays responses to prompts it has already answered.
+
+    Responses are keyed by a SHA-256 of (system instruction, prompt), kept in
+    memory and persisted as JSON files under cache_dir so they survive restarts.
+    """
+
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    def __init__(self, tool: CodingTool, cache_dir: Path,
+                 ttl: Optional[int] = DEFAULT_TTL_SECONDS):
+        self.tool = tool
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+
+    def __enter__(self) -> "CachingCodingTool":
+        self.tool.__enter__()
+        return self
+
+    def close(self):
+        """Release the wrapped tool's resources."""
+        self.tool.close()
+
+    def _cache_key(self, kind: str, prompt: str, system_instruction: Optional[str]) -> str:
+        """Hash the query kind, system instruction and prompt into a cache key."""
+        digest = hashlib.sha256()
+        digest.update(kind.encode())
+        digest.update(b"\x00")
+        digest.update((system_instruction or "").encode())
+        digest.update(b"\x00")
+        digest.update(prompt.encode())
+        return digest.hexdigest()
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None if missing or expired."""
+        entry = self._memory.get(key)
+        if entry is None:
             try:
-                return future.result(timeout=timeout)
-            except FuturesTimeoutError:
-                future.cancel()
-                raise TimeoutError(f"Query timed out after {timeout} seconds")
+                data = json_codec.loads((self.cache_dir / f"{key}.json").read_bytes())
+                entry = (data["ts"], data["response"])
+            except (OSError, ValueError, KeyError):
+                return None
+            self._memory[key] = entry
+
+        ts, response = entry
+        if self.ttl is not None and time.time() - ts > self.ttl:
+            del self._memory[key]
+            return None
+        return response
+
+    def _store(self, key: str, response: Any):
+        """Remember a response in memory and on disk."""
+        ts = time.time()
+        self._memory[key] = (ts, response)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Keep the cache out of the project's commits
+            gitignore = self.cache_dir / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("*\n")
+            (self.cache_dir / f"{key}.json").write_bytes(json_codec.dumps({"response": response, "ts": ts}))
+        except OSError as e:
+            print(f"Warning: could not write response cache: {e}")
+
+    def query(self, prompt: str, system_instruction: Optional[str] = None,
+              retries: int = 3, timeout: Optional[int] = None) -> str:
+        """Query the wrapped tool unless the same prompt was answered before."""
+        key = self._cache_key("text", prompt, system_instruction)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self.tool.query(prompt, system_instruction, retries, timeout)
+        self._store(key, response)
+        return response
+
+    def query_json(self, prompt: str, system_instruction: Optional[str] = None,
+                   retries: int = 3, timeout: Optional[int] = None) -> dict:
+        """Query the wrapped tool for JSON, caching the parsed result."""
+        key = self._cache_key("json", prompt, system_instruction)
+        cached = self._lookup(key)
+        if cached is not None:
+            # Callers mutate the returned dict, so never hand out the cached object
+            return copy.deepcopy(cached)
+
+        response = self.tool.query_json(prompt, system_instruction, retries, timeout)
+        self._store(key, copy.deepcopy(response))
+        return response
@@ -31,3 +31,4 @@ class AgentConfig:
     # Behavior settings
     max_retries: int = 5
     background_task_timeout: int = 180  # 3 minutes of no output = stuck
+    max_context_chars: int = 100000  # Codebase characters sent per prompt (0 = unlimited)
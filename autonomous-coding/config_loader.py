@@ -208,7 +208,8 @@ def load_config(config_path: str, merge_base: bool = True) -> AgentConfig:
         domain_knowledge=data.get('domain_knowledge', ''),
         file_patterns=data.get('file_patterns', ['*']),
         max_retries=data.get('max_retries', 5),
-        background_task_timeout=data.get('background_task_timeout', 180)
+        background_task_timeout=data.get('background_task_timeout', 180),
+        max_context_chars=data.get('max_context_chars', 100000)
     )
 
 
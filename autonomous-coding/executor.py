@@ -6,13 +6,20 @@ Executes shell commands and captures output.
 Supports both foreground and background execution.
 """
 
+import re
+import shlex
 import subprocess
 import time
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 from background_manager import BackgroundManager
 
 
+# Anything here needs /bin/sh: pipes, redirects, chaining, expansion, globbing,
+# comments and VAR=value prefixes.
+_SHELL_META_RE = re.compile(r"[|&;<>()$`\\*?\[\]{}~!#=\n]")
+
+
 class Executor:
     """Executes shell commands in a project directory."""
 
@@ -56,38 +63,60 @@ class Executor:
         Returns:
             Tuple of (exit_code, output)
         """
+        args = self._split_command(command)
         try:
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                cwd=self.project_dir
-            )
-
-            output = ""
-            start_time = time.time()
-
-            while True:
-                # Check timeout
-                if timeout and (time.time() - start_time) > timeout:
-                    process.terminate()
-                    time.sleep(0.5)
-                    if process.poll() is None:
-                        process.kill()
-                    return -1, f"Command timed out after {timeout} seconds"
-
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if line:
-                    output += line
-
-            return process.returncode, output
+            try:
+                result = self._run_process(args or command, timeout)
+            except FileNotFoundError:
+                if args is None:
+                    raise
+                # Shell builtins such as `exit` or `source` have no executable
+                result = self._run_process(command, timeout)
+            return result.returncode, result.stdout
+        except subprocess.TimeoutExpired:
+            return -1, f"Command timed out after {timeout} seconds"
         except Exception as e:
             return 1, f"Error executing command: {e}"
 
+    @staticmethod
+    def _split_command(command: str) -> Optional[List[str]]:
+        """
+        Split a simple command into argv so it can run without a shell.
+
+        Args:
+            command: Shell command to execute
+
+        Returns:
+            Argument list, or None if the command needs shell features
+        """
+        if _SHELL_META_RE.search(command):
+            return None
+        try:
+            return shlex.split(command) or None
+        except ValueError:
+            return None
+
+    def _run_process(self, command: Union[str, List[str]], timeout: Optional[int]) -> subprocess.CompletedProcess:
+        """
+        Run argv directly, or a command string through /bin/sh.
+
+        Args:
+            command: Argument list, or shell command string
+            timeout: Optional timeout in seconds
+
+        Returns:
+            Completed process with stderr merged into stdout
+        """
+        return subprocess.run(
+            command,
+            shell=isinstance(command, str),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=self.project_dir,
+            timeout=timeout or None
+        )
+
     def _run_background(
         self,
         command: str,
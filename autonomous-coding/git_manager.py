@@ -5,38 +5,84 @@ Git Manager
 Manages Git operations for version control.
 """
 
+import getpass
+import socket
+
 
 class GitManager:
-    """Handles Git operations."""
-    
+    """Handles Git operations in-process through libgit2 (pygit2)."""
+
     def __init__(self, repo_path: str):
-        import git
-        self.repo = git.Repo(repo_path)
-    
+        import pygit2
+        self._pygit2 = pygit2
+        # NO_SEARCH: a project without its own .git must not open an enclosing repository
+        self.repo = pygit2.Repository(repo_path, pygit2.enums.RepositoryOpenFlag.NO_SEARCH)
+
+    def _signature(self):
+        """
+        Get the commit signature from git config, falling back to user@host.
+
+        Returns:
+            pygit2.Signature for author and committer
+        """
+        try:
+            return self.repo.default_signature
+        except KeyError:
+            user = getpass.getuser()
+            return self._pygit2.Signature(user, f"{user}@{socket.gethostname()}")
+
     def commit(self, message: str):
         """
         Stage and commit all changes.
-        
+
         Args:
             message: Commit message
         """
-        self.repo.git.add(A=True)
-        self.repo.index.commit(message)
-    
+        pygit2 = self._pygit2
+        index = self.repo.index
+
+        # add_all() only adds and updates; deletions have to be staged explicitly
+        deleted = [
+            path for path, flags in self.repo.status(untracked_files="no").items()
+            if flags & pygit2.GIT_STATUS_WT_DELETED
+        ]
+        if deleted:
+            index.remove_all(deleted)
+        index.add_all()
+        index.write()
+
+        tree = index.write_tree()
+        parents = [] if self.repo.head_is_unborn else [self.repo.head.target]
+        signature = self._signature()
+        self.repo.create_commit("HEAD", signature, signature, message, tree, parents)
+
     def get_diff(self) -> str:
         """
         Get unstaged diff.
-        
+
         Returns:
             Git diff as string
         """
-        return self.repo.git.diff(None)
-    
+        return self.repo.diff().patch or ""
+
+    def is_ignored(self, path: str) -> bool:
+        """
+        Check whether a path is excluded by .gitignore and other exclude files.
+
+        Args:
+            path: Path relative to the repository root, directories ending in '/'
+
+        Returns:
+            True if git ignores the path
+        """
+        return self.repo.path_is_ignored(path)
+
     def get_untracked_files(self) -> list:
         """
         Get list of untracked files.
-        
+
         Returns:
             List of untracked file paths
         """
-        return self.repo.untracked_files
+        status = self.repo.status(untracked_files="all")
+        return sorted(path for path, flags in status.items() if flags & self._pygit2.GIT_STATUS_WT_NEW)
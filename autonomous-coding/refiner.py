@@ -5,9 +5,9 @@ Task Refiner
 Analyzes task execution results and refines the task list.
 """
 
-import json
 from typing import List, Dict, Optional
 
+import json_codec
 from coding_tool import CodingTool
 from config import AgentConfig
 from config_registry import ConfigRegistry
@@ -46,11 +46,11 @@ class TaskRefiner:
             Updated list of tasks
         """
         refine_context = f"Requirement: {requirement}\n"
+        refine_context += f"Current Codebase:\n{file_context}\n"
+        refine_context += f"Current Tasks: {json_codec.dumps(tasks, indent=True).decode()}\n"
         refine_context += f"Last Task ID: {last_task_id or 'N/A'}\n"
         refine_context += f"Last Task Implementation Attempt:\n{last_coder_response}\n"
-        refine_context += f"Last Task Result: {last_result}\n"
-        refine_context += f"Current Tasks: {json.dumps(tasks, indent=2)}\n"
-        refine_context += f"Current Codebase:\n{file_context}"
+        refine_context += f"Last Task Result: {last_result}"
 
         if exit_code != 0:
             refine_context += "\n\nCRITICAL INSTRUCTION: The last task FAILED. You must NOT leave the task list as is. You MUST break down the failed task into smaller, simpler subtasks to resolve the error. Do not just retry the same task."
@@ -6,11 +6,16 @@ Manages task checkpoints and rollback operations.
 """
 
 import re
+import shutil
 import subprocess
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import List, Optional
 
+# CachingCodingTool's response store under the project (see agent.autonomous_coding)
+_RESPONSE_CACHE_DIR = ".agent_cache"
+
 
 @dataclass
 class TaskCheckpoint:
@@ -102,6 +107,9 @@ class RollbackManager:
             )
 
             if result.returncode == 0:
+                # The cache is git-ignored, so the reset leaves it in place; without this
+                # the next run would replay responses that produced the undone commits
+                shutil.rmtree(Path(self.project_dir) / _RESPONSE_CACHE_DIR, ignore_errors=True)
                 print(f"Successfully rolled back to task {task_id} (commit {target.commit_hash[:8]})")
                 return True
             else:
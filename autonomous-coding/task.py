@@ -5,29 +5,21 @@ Task Data Model
 SubTask data model representing a single task in the development workflow.
 """
 
+from dataclasses import dataclass, fields
 from typing import Optional
 
 
+@dataclass(slots=True)
 class SubTask:
     """Represents a single subtask in the autonomous coding workflow."""
 
-    def __init__(
-        self,
-        id: str,
-        title: str,
-        description: str,
-        test_command: str,
-        status: str = "pending",
-        updated_time: Optional[str] = None,
-        failure_reason: Optional[str] = None
-    ):
-        self.id = id
-        self.title = title
-        self.description = description
-        self.test_command = test_command
-        self.status = status
-        self.updated_time = updated_time
-        self.failure_reason = failure_reason
+    id: str
+    title: str
+    description: str
+    test_command: str
+    status: str = "pending"
+    updated_time: Optional[str] = None
+    failure_reason: Optional[str] = None
 
     def model_dump(self, mode: str = 'python', exclude_none: bool = False) -> dict:
         """
@@ -40,15 +32,18 @@ class SubTask:
         Returns:
             Dictionary representation of the task
         """
-        result = {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "test_command": self.test_command,
-            "status": self.status,
-        }
-        if not exclude_none or self.updated_time is not None:
-            result["updated_time"] = self.updated_time
-        if not exclude_none or self.failure_reason is not None:
-            result["failure_reason"] = self.failure_reason
+        if not exclude_none:
+            return {name: getattr(self, name) for name in _FIELD_NAMES}
+        result = {name: getattr(self, name) for name in _REQUIRED_FIELD_NAMES}
+        for name in _OPTIONAL_FIELD_NAMES:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
         return result
+
+
+# Field order is fixed at class creation; computing it once keeps model_dump
+# free of dataclasses.fields()/asdict() overhead on every call.
+_FIELD_NAMES = tuple(f.name for f in fields(SubTask))
+_OPTIONAL_FIELD_NAMES = ("updated_time", "failure_reason")
+_REQUIRED_FIELD_NAMES = tuple(name for name in _FIELD_NAMES if name not in _OPTIONAL_FIELD_NAMES)
@@ -5,41 +5,89 @@ Task Manager
 Manages task state, persistence, and lifecycle.
 """
 
-import json
+import heapq
+import os
+from dataclasses import fields
 from pathlib import Path
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
+import json_codec
 from task import SubTask
 
 
+_ACTIVE_STATUSES = frozenset({"pending", "in_progress"})
+_TASK_FIELDS = frozenset(f.name for f in fields(SubTask))
+
+
+def _utc_timestamp() -> str:
+    """Current time as a timezone-aware ISO 8601 string (datetime.utcnow() is deprecated)."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _make_task(task_dict: dict) -> SubTask:
+    """Build a SubTask from a stored dict, ignoring unknown keys; missing optional fields take their defaults."""
+    if task_dict.keys() <= _TASK_FIELDS:
+        return SubTask(**task_dict)
+    return SubTask(**{k: v for k, v in task_dict.items() if k in _TASK_FIELDS})
+
+
 class TaskManager:
     """Manages task state and persistence."""
 
     def __init__(self, project_dir: Path):
         self.tasks_file = project_dir / "tasks.json"
-        self.tasks: List[SubTask] = []
+        self._tasks: List[SubTask] = []
+        # task id -> list position (first occurrence wins, like a front-to-back scan)
+        self._index_by_id: Dict[str, int] = {}
+        # Min-heap of positions of tasks that were active when pushed. Entries whose
+        # task has since finished are dropped lazily by get_next_task.
+        self._active: List[int] = []
         self.requirement: str = ""
         self.stop_reason: Optional[str] = None
         self.reason_detail: Optional[str] = None
+        # Bytes last read from or written to tasks_file, to skip no-op rewrites
+        self._saved: Optional[bytes] = None
         self.load_tasks()
     
+    @property
+    def tasks(self) -> List[SubTask]:
+        """Tasks in execution order. Change statuses through TaskManager so the index stays current."""
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks: List[SubTask]):
+        self._tasks = tasks
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuild the id index and the active-task heap from the task list."""
+        self._index_by_id = {}
+        for position, task in enumerate(self._tasks):
+            self._index_by_id.setdefault(task.id, position)
+        # Positions are produced in ascending order, which is already a valid heap
+        self._active = [position for position, task in enumerate(self._tasks)
+                        if task.status in _ACTIVE_STATUSES]
+
+    def _find_task(self, task_id: str) -> Optional[SubTask]:
+        """Look up a task by id."""
+        position = self._index_by_id.get(task_id)
+        return None if position is None else self._tasks[position]
+
+    def _set_status(self, task: SubTask, status: str):
+        """Change a task's status, re-queueing it if it becomes active again."""
+        task.status = status
+        if status in _ACTIVE_STATUSES:
+            heapq.heappush(self._active, self._index_by_id[task.id])
+
     def load_tasks(self):
         """Load tasks from tasks.json file."""
         if not self.tasks_file.exists():
             return
 
-        with open(self.tasks_file, "r") as f:
-            data = json.load(f)
-
-        _TASK_FIELDS = {"id", "title", "description", "test_command", "status",
-                        "updated_time", "failure_reason"}
-
-        def _make_task(t: dict) -> SubTask:
-            task_dict = {k: v for k, v in t.items() if k in _TASK_FIELDS}
-            task_dict.setdefault("updated_time", None)
-            task_dict.setdefault("failure_reason", None)
-            return SubTask(**task_dict)
+        raw = self.tasks_file.read_bytes()
+        data = json_codec.loads(raw)
+        self._saved = raw
 
         if isinstance(data, dict):
             self.tasks = [_make_task(t) for t in data.get("tasks", [])]
@@ -49,21 +97,31 @@ class TaskManager:
         else:
             self.tasks = [_make_task(t) for t in data]
     
-    def save_tasks(self):
-        """Save tasks to tasks.json file."""
-        with open(self.tasks_file, "w") as f:
-            tasks_data = []
-            for task in self.tasks:
-                task_dict = task.model_dump(exclude_none=False)
-                if "updated_time" not in task_dict:
-                    task_dict["updated_time"] = None
-                tasks_data.append(task_dict)
-            json.dump({
-                "requirement": self.requirement,
-                "stop_reason": self.stop_reason,
-                "reason_detail": self.reason_detail,
-                "tasks": tasks_data
-            }, f, indent=2)
+    def save_tasks(self, force: bool = False):
+        """
+        Save tasks to tasks.json file.
+
+        The file is replaced atomically, so a crash mid-write never leaves a
+        truncated tasks.json behind for --recover. Nothing is written when the
+        serialized state matches what is already on disk.
+
+        Args:
+            force: Write even if the content is unchanged
+        """
+        # SubTask dataclasses are encoded directly, without an intermediate dict per task
+        data = json_codec.dumps({
+            "requirement": self.requirement,
+            "stop_reason": self.stop_reason,
+            "reason_detail": self.reason_detail,
+            "tasks": self.tasks
+        }, indent=True)
+        if not force and data == self._saved:
+            return
+
+        tmp_file = self.tasks_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, self.tasks_file)
+        self._saved = data
     
     def set_tasks(self, tasks: List[Dict], requirement: Optional[str] = None):
         """
@@ -100,9 +158,11 @@ class TaskManager:
         Returns:
             Next pending/in_progress task, or None if all are completed/failed
         """
-        for task in self.tasks:
-            if task.status in ["pending", "in_progress"]:
+        while self._active:
+            task = self._tasks[self._active[0]]
+            if task.status in _ACTIVE_STATUSES:
                 return task
+            heapq.heappop(self._active)
         return None
 
     def find_completed_duplicate(self, task: SubTask) -> Optional[SubTask]:
@@ -131,11 +191,10 @@ class TaskManager:
             task_id: Task ID to update
             status: New status value
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                task.status = status
-                task.updated_time = datetime.utcnow().isoformat()
-                break
+        task = self._find_task(task_id)
+        if task is not None:
+            self._set_status(task, status)
+            task.updated_time = _utc_timestamp()
         self.save_tasks()
 
     def record_task_failure(self, task_id: str, error: str):
@@ -146,12 +205,11 @@ class TaskManager:
             task_id: Task ID to mark as failed
             error: Error message to record as failure_reason
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                task.status = "failed"
-                task.failure_reason = error[:1000]
-                task.updated_time = datetime.utcnow().isoformat()
-                break
+        task = self._find_task(task_id)
+        if task is not None:
+            self._set_status(task, "failed")
+            task.failure_reason = error[:1000]
+            task.updated_time = _utc_timestamp()
         self.save_tasks()
     
     def set_stop_reason(self, reason: str, detail: Optional[str] = None):
@@ -174,6 +232,10 @@ class TaskManager:
             task: SubTask to add
         """
         if not task.updated_time:
-            task.updated_time = datetime.utcnow().isoformat()
-        self.tasks.append(task)
+            task.updated_time = _utc_timestamp()
+        position = len(self._tasks)
+        self._tasks.append(task)
+        self._index_by_id.setdefault(task.id, position)
+        if task.status in _ACTIVE_STATUSES:
+            heapq.heappush(self._active, position)
         self.save_tasks()
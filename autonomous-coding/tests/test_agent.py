@@ -13,6 +13,7 @@ from task import SubTask
 from task_manager import TaskManager
 from agent import AutonomousAgent
 from coding_tool import CodingTool
+from config import AgentConfig
 from config_registry import ConfigRegistry
 
 
@@ -36,6 +37,7 @@ def _make_agent(tasks_data=None, requirement="req"):
     # Mock GitManager so tests don't need a real git repo
     with patch("agent.GitManager") as mock_git_cls:
         mock_git_cls.return_value = MagicMock()
+        mock_git_cls.return_value.is_ignored.return_value = False
         agent = AutonomousAgent(
             requirement=requirement,
             project_dir=tmp,
@@ -75,6 +77,13 @@ class TestExecuteTaskSuccess:
         agent._execute_task_with_retry(task, max_retries=1)
         agent.git_manager.commit.assert_called_once()
 
+    def test_coder_prompt_puts_codebase_before_subtask(self):
+        agent, tmp = _make_agent([_task_dict(id="1", description="Do the thing")])
+        (tmp / "main.py").write_text("x = 1")
+        agent._execute_task_with_retry(agent.task_manager.tasks[0], max_retries=1)
+        prompt = agent.coding_tool.query.call_args.args[0]
+        assert prompt.index("x = 1") < prompt.index("Subtask: Do the thing")
+
     def test_resets_retry_state_on_success(self):
         agent, _ = _make_agent([_task_dict(id="1")])
         agent.retry_manager.record_attempt("1", "prev error", False)
@@ -241,3 +250,211 @@ class TestParseFilesFromResponse:
     def test_returns_empty_dict_when_no_files(self):
         agent, _ = _make_agent()
         assert agent.parse_files_from_response("No changes needed.") == {}
+
+
+# ---------------------------------------------------------------------------
+# get_file_context()
+# ---------------------------------------------------------------------------
+
+class TestGetFileContext:
+    def test_includes_project_files(self):
+        agent, tmp = _make_agent()
+        (tmp / "src").mkdir()
+        (tmp / "src" / "main.py").write_text("print('hi')")
+        context = agent.get_file_context()
+        assert "FILE: src/main.py" in context
+        assert "print('hi')" in context
+
+    def test_skips_excluded_dirs_and_files(self):
+        agent, tmp = _make_agent([_task_dict(id="1")])
+        (tmp / "node_modules").mkdir()
+        (tmp / "node_modules" / "lib.js").write_text("ignored")
+        context = agent.get_file_context()
+        assert "lib.js" not in context
+        assert "tasks.json" not in context
+
+    def test_skips_git_ignored_paths(self):
+        agent, tmp = _make_agent()
+        agent.git_manager.is_ignored.side_effect = lambda path: path in ("out/", "debug.py")
+        (tmp / "out").mkdir()
+        (tmp / "out" / "gen.py").write_text("generated")
+        (tmp / "debug.py").write_text("scratch")
+        (tmp / "main.py").write_text("x = 1")
+        context = agent.get_file_context()
+        assert "generated" not in context
+        assert "scratch" not in context
+        assert "x = 1" in context
+
+    def test_skips_binary_files(self):
+        agent, tmp = _make_agent()
+        (tmp / "blob.py").write_bytes(b"\x00\x01binary")
+        (tmp / "text.py").write_text("x = 1")
+        context = agent.get_file_context()
+        assert "blob.py" not in context
+        assert "x = 1" in context
+
+    def test_invalid_utf8_is_replaced(self):
+        agent, tmp = _make_agent()
+        (tmp / "latin.py").write_bytes(b"name = 'caf\xe9'")
+        assert "name = 'caf\ufffd'" in agent.get_file_context()
+
+    def test_unchanged_files_are_not_reread(self):
+        agent, tmp = _make_agent()
+        (tmp / "a.py").write_text("x = 1")
+        agent.get_file_context()
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            context = agent.get_file_context()
+        assert "x = 1" in context
+
+    def test_picks_up_modified_and_deleted_files(self):
+        agent, tmp = _make_agent()
+        (tmp / "a.py").write_text("x = 1")
+        (tmp / "b.py").write_text("y = 2")
+        agent.get_file_context()
+        (tmp / "a.py").write_text("x = 100")
+        (tmp / "b.py").unlink()
+        context = agent.get_file_context()
+        assert "x = 100" in context
+        assert "b.py" not in context
+        assert "b.py" not in agent._file_cache
+
+
+# ---------------------------------------------------------------------------
+# _execute_task_with_retry — error patterns in test output
+# ---------------------------------------------------------------------------
+
+class TestErrorPatternDetection:
+    def test_error_in_output_fails_task_despite_zero_exit(self):
+        agent, _ = _make_agent([_task_dict(id="1")])
+        agent.executor.run_command = MagicMock(return_value=(0, "1 passed, AssertionError logged"))
+        agent.refiner.refine = MagicMock(return_value=[_task_dict(id="1")])
+        task = agent.task_manager.tasks[0]
+        assert agent._execute_task_with_retry(task, max_retries=1) is False
+
+    def test_clean_output_passes(self):
+        agent, _ = _make_agent([_task_dict(id="1")])
+        agent.executor.run_command = MagicMock(return_value=(0, "3 passed in 0.1s"))
+        task = agent.task_manager.tasks[0]
+        assert agent._execute_task_with_retry(task, max_retries=1) is True
+
+
+# ---------------------------------------------------------------------------
+# _relevant_files() / _build_context()
+# ---------------------------------------------------------------------------
+
+class TestRelevantContext:
+    def test_files_named_in_task_come_first(self):
+        agent, tmp = _make_agent()
+        (tmp / "a.py").write_text("x = 1")
+        (tmp / "b.py").write_text("y = 2")
+        task = SubTask(id="1", title="Fix b.py", description="D", test_command="pytest")
+        assert agent._relevant_files(task)[0] == "b.py"
+
+    def test_previously_written_files_come_next(self):
+        agent, tmp = _make_agent()
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp / name).write_text("pass")
+        agent._last_changed_files = {"c.py"}
+        task = SubTask(id="1", title="Fix a.py", description="D", test_command="pytest")
+        assert agent._relevant_files(task)[:2] == ["a.py", "c.py"]
+
+    def test_ranks_by_keyword_overlap(self):
+        agent, tmp = _make_agent()
+        (tmp / "noise.py").write_text("print('unrelated')")
+        (tmp / "auth.py").write_text("def login(user, password): pass")
+        task = SubTask(id="1", title="Validate password on login",
+                       description="D", test_command="pytest")
+        assert agent._relevant_files(task)[0] == "auth.py"
+
+    def test_context_respects_budget_without_truncating(self):
+        agent, tmp = _make_agent()
+        agent.config = AgentConfig(planner_system_prompt="", max_context_chars=300)
+        (tmp / "big.py").write_text("a" * 200)
+        (tmp / "other.py").write_text("b" * 200)
+        agent._scan_files()
+        context = agent._build_context(["big.py", "other.py"])
+        assert "a" * 200 in context
+        assert "b" * 200 not in context
+        assert "- other.py" in context
+
+    def test_context_renders_files_in_path_order(self):
+        agent, tmp = _make_agent()
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp / name).write_text(f"# {name}")
+        agent._scan_files()
+        context = agent._build_context(["c.py", "a.py", "b.py"])
+        assert context == agent._build_context(["a.py", "b.py", "c.py"])
+
+    def test_first_file_included_even_if_over_budget(self):
+        agent, tmp = _make_agent()
+        agent.config = AgentConfig(planner_system_prompt="", max_context_chars=10)
+        (tmp / "big.py").write_text("a" * 200)
+        agent._scan_files()
+        assert "a" * 200 in agent._build_context(["big.py"])
+
+
+# ---------------------------------------------------------------------------
+# _should_include_file()
+# ---------------------------------------------------------------------------
+
+class TestShouldIncludeFile:
+    def test_matches_path_or_basename(self):
+        agent, tmp = _make_agent()
+        agent.config = AgentConfig(planner_system_prompt="", file_patterns=["*.py", "docs/*.md"])
+        assert agent._should_include_file(str(tmp / "pkg" / "m.py"), "pkg/m.py")
+        assert agent._should_include_file(str(tmp / "docs" / "a.md"), "docs/a.md")
+        assert not agent._should_include_file(str(tmp / "README.md"), "README.md")
+
+    def test_no_patterns_includes_everything(self):
+        agent, tmp = _make_agent()
+        agent.config = AgentConfig(planner_system_prompt="", file_patterns=[])
+        assert agent._should_include_file(str(tmp / "data.bin"), "data.bin")
+
+
+# ---------------------------------------------------------------------------
+# _refine_after_failure()
+# ---------------------------------------------------------------------------
+
+class TestRefineAfterFailure:
+    def test_unchanged_task_list_is_not_rewritten(self):
+        agent, _ = _make_agent([_task_dict(id="1")])
+        task = agent.task_manager.tasks[0]
+        agent.refiner.refine = MagicMock(return_value=[task.model_dump()])
+        agent.task_manager.set_tasks = MagicMock()
+        agent._refine_after_failure(task, "resp", "result", "ctx", 1)
+        agent.task_manager.set_tasks.assert_not_called()
+
+    def test_changed_task_list_is_applied(self):
+        agent, _ = _make_agent([_task_dict(id="1")])
+        task = agent.task_manager.tasks[0]
+        agent.refiner.refine = MagicMock(return_value=[_task_dict(id="1-1"), _task_dict(id="1-2")])
+        agent._refine_after_failure(task, "resp", "result", "ctx", 1)
+        assert [t.id for t in agent.task_manager.tasks] == ["1-1", "1-2"]
+
+
+# ---------------------------------------------------------------------------
+# _write_files()
+# ---------------------------------------------------------------------------
+
+class TestWriteFiles:
+    def test_writes_files_and_creates_directories(self):
+        agent, tmp = _make_agent()
+        files = {"a.py": "x = 1", "pkg/sub/b.py": "y = 'café'"}
+        written = agent._write_files(files)
+        assert written == ["a.py", "pkg/sub/b.py"]
+        assert (tmp / "a.py").read_text() == "x = 1"
+        assert (tmp / "pkg" / "sub" / "b.py").read_text(encoding="utf-8") == "y = 'café'"
+
+    def test_written_files_are_reread_into_context(self):
+        agent, tmp = _make_agent()
+        (tmp / "a.py").write_text("old")
+        agent.get_file_context()
+        agent._write_files({"a.py": "new"})
+        assert "new" in agent.get_file_context()
+        assert agent._last_changed_files == {"a.py"}
+
+    def test_applies_coder_response_files(self):
+        agent, tmp = _make_agent([_task_dict(id="1")])
+        agent.coding_tool.query.return_value = "FILE: src/app.py\n```python\nprint(1)\n```"
+        agent._execute_task_with_retry(agent.task_manager.tasks[0], max_retries=1)
+        assert (tmp / "src" / "app.py").read_text() == "print(1)"
@@ -2,11 +2,15 @@
 
 import json
 import os
+import subprocess
 import sys
+import tempfile
+import time
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from coding_tool import OpenCodeCodingTool, ClaudeCodingTool
+from coding_tool import OpenCodeCodingTool, ClaudeCodingTool, CachingCodingTool, CodingToolError
 
 
 def _make_completed_process(stdout="output", returncode=0):
@@ -17,25 +21,48 @@ def _make_completed_process(stdout="output", returncode=0):
     return mock
 
 
+def _make_opencode_process(stdout="output", returncode=0):
+    """OpenCode is run in binary mode, so its output arrives as bytes."""
+    mock = MagicMock()
+    mock.returncode = returncode
+    mock.stdout = stdout.encode()
+    mock.stderr = b""
+    return mock
+
+
 class TestOpenCodeCodingTool:
     def test_query_returns_stdout(self):
         tool = OpenCodeCodingTool()
-        with patch("subprocess.run", return_value=_make_completed_process("hello")) as mock_run:
+        with patch("subprocess.run", return_value=_make_opencode_process("hello")) as mock_run:
             result = tool.query("do something")
             assert result == "hello"
             mock_run.assert_called_once()
 
     def test_query_prepends_system_instruction(self):
         tool = OpenCodeCodingTool()
-        with patch("subprocess.run", return_value=_make_completed_process("ok")) as mock_run:
+        with patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
             tool.query("task prompt", system_instruction="be helpful")
             call_input = mock_run.call_args.kwargs["input"]
-            assert "be helpful" in call_input
-            assert "task prompt" in call_input
+            assert call_input == b"be helpful\n\nTask:\ntask prompt"
+
+    def test_query_encodes_non_ascii_prompt(self):
+        tool = OpenCodeCodingTool()
+        with patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            tool.query("r\u00e9sum\u00e9")
+            assert mock_run.call_args.kwargs["input"] == "r\u00e9sum\u00e9".encode()
+
+    def test_query_json_appends_json_instruction(self):
+        tool = OpenCodeCodingTool()
+        with patch("subprocess.run", return_value=_make_opencode_process("{}")) as mock_run:
+            tool.query_json("plan this", system_instruction="sys")
+            call_input = mock_run.call_args.kwargs["input"]
+            assert call_input.startswith(b"sys\n\nTask:\nplan this")
+            assert call_input.endswith(b"Return ONLY the JSON object requested.")
 
     def test_query_raises_on_nonzero_exit(self):
         tool = OpenCodeCodingTool()
-        with patch("subprocess.run", return_value=_make_completed_process("fail", returncode=1)):
+        with patch("subprocess.run", return_value=_make_opencode_process("fail", returncode=1)), \
+                patch("time.sleep"):
             try:
                 tool.query("prompt")
                 assert False, "Expected exception"
@@ -45,27 +72,112 @@ class TestOpenCodeCodingTool:
     def test_query_json_parses_json(self):
         tool = OpenCodeCodingTool()
         payload = json.dumps({"tasks": [{"id": "1"}]})
-        with patch("subprocess.run", return_value=_make_completed_process(payload)):
+        with patch("subprocess.run", return_value=_make_opencode_process(payload)):
             result = tool.query_json("give me json")
             assert result == {"tasks": [{"id": "1"}]}
 
     def test_query_json_extracts_json_from_prose(self):
         tool = OpenCodeCodingTool()
         payload = 'Here is the result: {"tasks": []} and that is it.'
-        with patch("subprocess.run", return_value=_make_completed_process(payload)):
+        with patch("subprocess.run", return_value=_make_opencode_process(payload)):
             result = tool.query_json("give me json")
             assert result == {"tasks": []}
 
     def test_query_timeout_raises_timeout_error(self):
-        from concurrent.futures import TimeoutError as FuturesTimeout
         tool = OpenCodeCodingTool()
-        with patch("subprocess.run", side_effect=lambda *a, **kw: __import__("time").sleep(10)):
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("opencode", 1)):
             try:
                 tool.query("prompt", timeout=1)
                 assert False, "Expected TimeoutError"
             except TimeoutError as e:
                 assert "timed out" in str(e)
 
+    def test_query_passes_timeout_to_subprocess(self):
+        tool = OpenCodeCodingTool()
+        with patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            tool.query("prompt", timeout=42)
+            assert mock_run.call_args.kwargs["timeout"] == 42
+
+
+class TestOpenCodeServer:
+    def _server_process(self):
+        server = MagicMock()
+        server.poll.return_value = None
+        return server
+
+    def test_queries_attach_to_running_server(self):
+        server = self._server_process()
+        with patch("subprocess.Popen", return_value=server) as mock_popen, \
+                patch("socket.create_connection"), \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            with OpenCodeCodingTool() as tool:
+                tool.query("one")
+                tool.query("two")
+
+        assert mock_popen.call_count == 1
+        assert mock_popen.call_args.args[0][:2] == ["opencode", "serve"]
+        for call in mock_run.call_args_list:
+            command = call.args[0]
+            assert command[:3] == ["opencode", "run", "--attach"]
+            assert command[3].startswith("http://127.0.0.1:")
+        server.terminate.assert_called_once()
+
+    def test_falls_back_to_cold_start_when_server_missing(self):
+        with patch("subprocess.Popen", side_effect=FileNotFoundError("opencode")), \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            with OpenCodeCodingTool() as tool:
+                assert tool.query("prompt") == "ok"
+        assert mock_run.call_args.args[0] == ["opencode", "run"]
+
+    def test_falls_back_when_server_exits_early(self):
+        server = self._server_process()
+        server.poll.return_value = 1
+        with patch("subprocess.Popen", return_value=server), \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            with OpenCodeCodingTool() as tool:
+                tool.query("prompt")
+        assert mock_run.call_args.args[0] == ["opencode", "run"]
+
+    def test_restarts_server_that_dies_mid_run(self):
+        first, second = self._server_process(), self._server_process()
+        with patch("subprocess.Popen", side_effect=[first, second]) as mock_popen, \
+                patch("socket.create_connection"), \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            with OpenCodeCodingTool() as tool:
+                tool.query("one")
+                first.poll.return_value = 1
+                tool.query("two")
+
+        assert mock_popen.call_count == 2
+        assert mock_run.call_args.args[0][:3] == ["opencode", "run", "--attach"]
+        first.terminate.assert_not_called()
+        second.terminate.assert_called_once()
+
+    def test_runs_cold_when_restart_fails(self):
+        server = self._server_process()
+        with patch("subprocess.Popen", side_effect=[server, FileNotFoundError("opencode")]), \
+                patch("socket.create_connection"), \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            with OpenCodeCodingTool() as tool:
+                server.poll.return_value = 1
+                assert tool.query("prompt") == "ok"
+        assert mock_run.call_args.args[0] == ["opencode", "run"]
+
+    def test_non_persistent_never_starts_server(self):
+        with patch("subprocess.Popen") as mock_popen, \
+                patch("subprocess.run", return_value=_make_opencode_process("ok")):
+            with OpenCodeCodingTool(persistent=False) as tool:
+                tool.query("prompt")
+        mock_popen.assert_not_called()
+
+    def test_caching_tool_manages_wrapped_tool(self):
+        inner = MagicMock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with CachingCodingTool(inner, Path(tmpdir)) as tool:
+                assert tool.tool is inner
+        inner.__enter__.assert_called_once()
+        inner.close.assert_called_once()
+
 
 class TestClaudeCodingTool:
     def test_query_calls_claude_cli(self):
@@ -106,7 +218,8 @@ class TestClaudeCodingTool:
 
     def test_query_raises_on_cli_failure(self):
         tool = ClaudeCodingTool()
-        with patch("subprocess.run", return_value=_make_completed_process("error msg", returncode=1)):
+        with patch("subprocess.run", return_value=_make_completed_process("error msg", returncode=1)), \
+                patch("time.sleep"):
             try:
                 tool.query("prompt")
                 assert False, "Expected exception"
@@ -135,9 +248,103 @@ class TestClaudeCodingTool:
 
     def test_query_timeout_raises_timeout_error(self):
         tool = ClaudeCodingTool()
-        with patch("subprocess.run", side_effect=lambda *a, **kw: __import__("time").sleep(10)):
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("claude", 1)):
             try:
                 tool.query("prompt", timeout=1)
                 assert False, "Expected TimeoutError"
             except TimeoutError as e:
                 assert "timed out" in str(e)
+
+
+class TestRetries:
+    def test_transient_failure_is_retried_with_backoff(self):
+        tool = OpenCodeCodingTool(persistent=False)
+        results = [_make_opencode_process("boom", returncode=1)] * 2 + [_make_opencode_process("ok")]
+        with patch("subprocess.run", side_effect=results) as mock_run, \
+                patch("time.sleep") as mock_sleep:
+            assert tool.query("prompt", retries=3) == "ok"
+        assert mock_run.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+    def test_raises_after_retries_exhausted(self):
+        tool = ClaudeCodingTool()
+        with patch("subprocess.run", return_value=_make_completed_process("boom", returncode=1)) as mock_run, \
+                patch("time.sleep"):
+            try:
+                tool.query("prompt", retries=2)
+                assert False, "Expected CodingToolError"
+            except CodingToolError:
+                pass
+        assert mock_run.call_count == 2
+
+    def test_unparseable_json_is_retried(self):
+        tool = ClaudeCodingTool()
+        results = [_make_completed_process("Sure! Working on it"), _make_completed_process('{"tasks": []}')]
+        with patch("subprocess.run", side_effect=results), patch("time.sleep"):
+            assert tool.query_json("plan", retries=2) == {"tasks": []}
+
+    def test_timeout_is_not_retried(self):
+        tool = OpenCodeCodingTool(persistent=False)
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("opencode", 1)) as mock_run, \
+                patch("time.sleep") as mock_sleep:
+            try:
+                tool.query("prompt", timeout=1, retries=3)
+                assert False, "Expected TimeoutError"
+            except TimeoutError:
+                pass
+        assert mock_run.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_zero_retries_still_makes_one_attempt(self):
+        tool = OpenCodeCodingTool(persistent=False)
+        with patch("subprocess.run", return_value=_make_opencode_process("ok")) as mock_run:
+            assert tool.query("prompt", retries=0) == "ok"
+        assert mock_run.call_count == 1
+
+
+class TestCachingCodingTool:
+    def _make_tool(self, ttl=CachingCodingTool.DEFAULT_TTL_SECONDS):
+        inner = MagicMock()
+        inner.query.return_value = "response"
+        inner.query_json.return_value = {"tasks": [{"id": "1"}]}
+        return inner, CachingCodingTool(inner, Path(tempfile.mkdtemp()) / ".agent_cache", ttl=ttl)
+
+    def test_repeated_query_hits_cache(self):
+        inner, tool = self._make_tool()
+        assert tool.query("prompt", system_instruction="sys") == "response"
+        assert tool.query("prompt", system_instruction="sys") == "response"
+        inner.query.assert_called_once()
+
+    def test_different_system_instruction_misses_cache(self):
+        inner, tool = self._make_tool()
+        tool.query("prompt", system_instruction="a")
+        tool.query("prompt", system_instruction="b")
+        assert inner.query.call_count == 2
+
+    def test_query_json_returns_independent_copies(self):
+        inner, tool = self._make_tool()
+        first = tool.query_json("plan")
+        first["tasks"].append({"id": "2"})
+        second = tool.query_json("plan")
+        assert second == {"tasks": [{"id": "1"}]}
+        inner.query_json.assert_called_once()
+
+    def test_cache_persists_across_instances(self):
+        inner, tool = self._make_tool()
+        tool.query("prompt")
+        other_inner = MagicMock()
+        other = CachingCodingTool(other_inner, tool.cache_dir)
+        assert other.query("prompt") == "response"
+        other_inner.query.assert_not_called()
+
+    def test_cache_dir_is_gitignored(self):
+        _, tool = self._make_tool()
+        tool.query("prompt")
+        assert (tool.cache_dir / ".gitignore").read_text() == "*\n"
+
+    def test_expired_entry_is_requeried(self):
+        inner, tool = self._make_tool(ttl=0)
+        tool.query("prompt")
+        time.sleep(0.01)
+        tool.query("prompt")
+        assert inner.query.call_count == 2
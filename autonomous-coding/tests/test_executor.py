@@ -0,0 +1,66 @@
+"""Unit tests for Executor foreground command execution."""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import Executor
+
+
+def _make_executor() -> Executor:
+    return Executor(tempfile.mkdtemp())
+
+
+class TestRunForeground:
+    def test_returns_exit_code_and_output(self):
+        exit_code, output = _make_executor().run_command("echo hello")
+        assert exit_code == 0
+        assert output == "hello\n"
+
+    def test_returns_nonzero_exit_code(self):
+        exit_code, _ = _make_executor().run_command("exit 3")
+        assert exit_code == 3
+
+    def test_merges_stderr_into_output(self):
+        _, output = _make_executor().run_command("echo out; echo err 1>&2")
+        assert "out" in output
+        assert "err" in output
+
+    def test_runs_in_project_dir(self):
+        executor = _make_executor()
+        _, output = executor.run_command("pwd")
+        assert os.path.realpath(output.strip()) == os.path.realpath(executor.project_dir)
+
+    def test_captures_large_output(self):
+        _, output = _make_executor().run_command("seq 1 20000")
+        assert output.count("\n") == 20000
+
+    def test_timeout_returns_minus_one(self):
+        exit_code, output = _make_executor().run_command("sleep 5", timeout=1)
+        assert exit_code == -1
+        assert "timed out" in output
+
+
+class TestCommandSplitting:
+    def test_simple_command_runs_without_shell(self):
+        assert Executor._split_command("python -m pytest -q 'tests/a b.py'") == [
+            "python", "-m", "pytest", "-q", "tests/a b.py"
+        ]
+
+    def test_shell_features_keep_shell(self):
+        for command in ("a | b", "a && b", "a > out", "echo $HOME", "ls *.py",
+                        "FOO=1 pytest", "a; b", "echo `date`"):
+            assert Executor._split_command(command) is None
+
+    def test_unbalanced_quotes_keep_shell(self):
+        assert Executor._split_command("echo 'oops") is None
+
+    def test_quoted_arguments_preserved(self):
+        _, output = _make_executor().run_command("printf '%s|' 'a b' c")
+        assert output == "a b|c|"
+
+    def test_missing_program_reports_shell_error(self):
+        exit_code, _ = _make_executor().run_command("definitely-not-a-command-xyz")
+        assert exit_code == 127
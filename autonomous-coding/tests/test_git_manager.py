@@ -0,0 +1,83 @@
+"""Tests for GitManager against a real temporary repository."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pygit2 = pytest.importorskip("pygit2")
+
+from git_manager import GitManager
+
+
+@pytest.fixture
+def repo_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pygit2.init_repository(tmpdir)
+        yield Path(tmpdir)
+
+
+class TestGitManager:
+    def test_commit_stages_new_modified_and_deleted(self, repo_dir):
+        (repo_dir / "keep.py").write_text("a = 1\n")
+        (repo_dir / "gone.py").write_text("b = 2\n")
+        manager = GitManager(str(repo_dir))
+        manager.commit("Initial")
+
+        (repo_dir / "keep.py").write_text("a = 2\n")
+        (repo_dir / "gone.py").unlink()
+        (repo_dir / "new.py").write_text("c = 3\n")
+        manager.commit("Second")
+
+        head = manager.repo.head.peel()
+        assert head.message == "Second"
+        assert len(head.parents) == 1
+        assert sorted(entry.name for entry in head.tree) == ["keep.py", "new.py"]
+        assert manager.repo.status() == {}
+
+    def test_get_diff_reports_unstaged_changes(self, repo_dir):
+        (repo_dir / "a.py").write_text("x = 1\n")
+        manager = GitManager(str(repo_dir))
+        manager.commit("Initial")
+        assert manager.get_diff() == ""
+
+        (repo_dir / "a.py").write_text("x = 2\n")
+        diff = manager.get_diff()
+        assert "-x = 1" in diff
+        assert "+x = 2" in diff
+
+    def test_ignored_and_untracked_paths(self, repo_dir):
+        (repo_dir / ".gitignore").write_text("dist/\n*.log\n")
+        (repo_dir / "dist").mkdir()
+        (repo_dir / "dist" / "out.js").write_text("")
+        (repo_dir / "run.log").write_text("")
+        (repo_dir / "src").mkdir()
+        (repo_dir / "src" / "m.py").write_text("")
+        manager = GitManager(str(repo_dir))
+
+        assert manager.is_ignored("dist/")
+        assert manager.is_ignored("run.log")
+        assert not manager.is_ignored("src/")
+        assert not manager.is_ignored("src/m.py")
+        assert manager.get_untracked_files() == [".gitignore", "src/m.py"]
+
+    def test_ignored_paths_inside_untracked_dirs(self, repo_dir):
+        (repo_dir / ".gitignore").write_text(".next/\n*.log\n")
+        (repo_dir / "frontend" / ".next").mkdir(parents=True)
+        (repo_dir / "frontend" / ".next" / "build.js").write_text("")
+        (repo_dir / "frontend" / "x.log").write_text("")
+        (repo_dir / "frontend" / "app.js").write_text("")
+        manager = GitManager(str(repo_dir))
+
+        assert manager.is_ignored("frontend/.next/")
+        assert manager.is_ignored("frontend/x.log")
+        assert not manager.is_ignored("frontend/app.js")
+
+    def test_does_not_open_enclosing_repository(self, repo_dir):
+        (repo_dir / "project").mkdir()
+        with pytest.raises(pygit2.GitError):
+            GitManager(str(repo_dir / "project"))
@@ -0,0 +1,44 @@
+"""Unit tests for the JSON codec helpers."""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_codec
+from task import SubTask
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param and not json_codec.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_codec, "ORJSON_AVAILABLE", request.param)
+    return request.param
+
+
+class TestJsonCodec:
+    def test_round_trip(self, backend):
+        data = {"tasks": [{"id": "1", "title": "Ünïcode", "updated_time": None}]}
+        assert json_codec.loads(json_codec.dumps(data)) == data
+
+    def test_loads_accepts_str_and_bytes(self, backend):
+        assert json_codec.loads('{"a": 1}') == {"a": 1}
+        assert json_codec.loads(b'{"a": 1}') == {"a": 1}
+
+    def test_indent_uses_two_spaces(self, backend):
+        assert json_codec.dumps({"a": [1]}, indent=True) == b'{\n  "a": [\n    1\n  ]\n}'
+
+    def test_invalid_json_raises_value_error(self, backend):
+        with pytest.raises(ValueError):
+            json_codec.loads("{not json")
+
+    def test_dataclasses_serialize_as_field_objects(self, backend):
+        task = SubTask(id="1", title="T", description="D", test_command="echo ok")
+        assert json_codec.loads(json_codec.dumps([task])) == [task.model_dump()]
+
+    def test_unsupported_objects_raise_type_error(self, backend):
+        with pytest.raises(TypeError):
+            json_codec.dumps(object())
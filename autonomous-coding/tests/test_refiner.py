@@ -0,0 +1,53 @@
+"""Unit tests for TaskRefiner."""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from refiner import TaskRefiner
+
+
+def _task(id="1", status="pending"):
+    return {"id": id, "title": "T", "description": "D", "test_command": "echo ok", "status": status}
+
+
+def _refine(r, tasks=None, result="passed", exit_code=0):
+    return r.refine(
+        requirement="Build it",
+        tasks=tasks if tasks is not None else [_task()],
+        last_coder_response="FILE: a.py",
+        last_result=result,
+        file_context="a.py",
+        exit_code=exit_code,
+        last_task_id="1",
+    )
+
+
+# ---------------------------------------------------------------------------
+# refine
+# ---------------------------------------------------------------------------
+
+class TestRefine:
+    def test_repeated_calls_query_each_time(self):
+        tool = MagicMock()
+        tool.query_json.return_value = {"tasks": [_task(), _task(id="2")]}
+        r = TaskRefiner(tool)
+
+        assert _refine(r) == _refine(r) == [_task(), _task(id="2")]
+        assert tool.query_json.call_count == 2
+
+    def test_completed_status_is_preserved(self):
+        tool = MagicMock()
+        tool.query_json.return_value = {"tasks": [_task()]}
+        r = TaskRefiner(tool)
+
+        assert _refine(r, tasks=[_task(status="completed")])[0]["status"] == "completed"
+
+    def test_errors_return_current_tasks(self):
+        tool = MagicMock()
+        tool.query_json.side_effect = RuntimeError("boom")
+        r = TaskRefiner(tool)
+
+        assert _refine(r) == [_task()]
@@ -0,0 +1,68 @@
+"""Tests for RollbackManager against a real temporary repository."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coding_tool import CachingCodingTool
+from rollback_manager import RollbackManager
+
+
+def _git(repo_dir, *args):
+    subprocess.run(["git", *args], cwd=repo_dir, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo_dir():
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _git(tmpdir, "init")
+        _git(tmpdir, "config", "user.name", "Test")
+        _git(tmpdir, "config", "user.email", "test@example.com")
+        for task_id in ("1", "2"):
+            (Path(tmpdir) / "app.py").write_text(f"task = {task_id}\n")
+            _git(tmpdir, "add", "app.py")
+            _git(tmpdir, "commit", "-m", f"[task-{task_id}] Task {task_id}")
+        yield Path(tmpdir)
+
+
+def _query(repo_dir, inner):
+    # A fresh wrapper each time, like a new run: only the on-disk cache carries over
+    return CachingCodingTool(inner, repo_dir / ".agent_cache").query("implement task 2")
+
+
+class TestRollbackManager:
+    def test_rollback_resets_to_task_commit(self, repo_dir):
+        assert RollbackManager(str(repo_dir)).rollback_to_task("1")
+        assert (repo_dir / "app.py").read_text() == "task = 1\n"
+
+    def test_rollback_clears_cached_responses(self, repo_dir):
+        inner = MagicMock()
+        inner.query.return_value = "task = 2"
+        _query(repo_dir, inner)
+        _query(repo_dir, inner)
+        assert inner.query.call_count == 1
+
+        assert RollbackManager(str(repo_dir)).rollback_to_task("1")
+
+        # The rolled-back task is asked again instead of replaying the undone code
+        _query(repo_dir, inner)
+        assert inner.query.call_count == 2
+
+    def test_unknown_task_keeps_cache(self, repo_dir):
+        inner = MagicMock()
+        inner.query.return_value = "task = 2"
+        _query(repo_dir, inner)
+
+        assert not RollbackManager(str(repo_dir)).rollback_to_task("9")
+        _query(repo_dir, inner)
+        assert inner.query.call_count == 1
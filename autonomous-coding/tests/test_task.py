@@ -49,3 +49,25 @@ class TestSubTaskModelDump:
         d = t.model_dump(exclude_none=True)
         assert d.get("updated_time") is None
         assert d.get("failure_reason") is None
+
+
+class TestSubTaskSlots:
+    def test_has_no_instance_dict(self):
+        t = SubTask(id="1", title="T", description="D", test_command="echo ok")
+        assert not hasattr(t, "__dict__")
+        assert "failure_reason" in SubTask.__slots__
+
+    def test_model_dump_preserves_field_order(self):
+        t = SubTask(id="1", title="T", description="D", test_command="echo ok")
+        assert list(t.model_dump()) == [
+            "id", "title", "description", "test_command",
+            "status", "updated_time", "failure_reason",
+        ]
+
+    def test_exclude_none_keeps_required_fields(self):
+        t = SubTask(id="1", title="T", description="D", test_command="echo ok",
+                    updated_time="2024-01-01T00:00:00")
+        d = t.model_dump(exclude_none=True)
+        assert d["updated_time"] == "2024-01-01T00:00:00"
+        assert "failure_reason" not in d
+        assert d["status"] == "pending"
@@ -4,6 +4,7 @@ import json
 import os
 import sys
 import tempfile
+from datetime import datetime, timedelta
 from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -59,6 +60,12 @@ class TestTaskManagerLoad:
         tm = TaskManager(path)
         assert tm.tasks[0].failure_reason is None
 
+    def test_ignores_unknown_fields_on_load(self):
+        task = dict(_task_dict(id="1"), priority="high")
+        _, tm = _make_manager([task])
+        assert tm.tasks[0].id == "1"
+        assert "priority" not in tm.tasks[0].model_dump()
+
     def test_loads_list_format(self):
         """Backwards-compat: tasks.json is a plain list."""
         tmp = tempfile.mkdtemp()
@@ -94,6 +101,33 @@ class TestTaskManagerSave:
         tm2 = TaskManager(path)
         assert tm2.tasks[0].failure_reason == "build error"
 
+    def test_saved_file_is_indented_json(self):
+        path, tm = _make_manager([_task_dict(id="1", title="Añadir índice")])
+        tm.save_tasks()
+        text = (path / "tasks.json").read_text(encoding="utf-8")
+        assert text.startswith('{\n  "requirement"')
+        assert json.loads(text)["tasks"][0]["title"] == "Añadir índice"
+
+    def test_unchanged_state_is_not_rewritten(self):
+        path, tm = _make_manager()
+        tm.set_tasks([_task_dict(id="1")])
+        mtime = (path / "tasks.json").stat().st_mtime_ns
+        os.utime(path / "tasks.json", ns=(mtime - 10**9, mtime - 10**9))
+        tm.save_tasks()
+        assert (path / "tasks.json").stat().st_mtime_ns == mtime - 10**9
+
+    def test_force_rewrites_unchanged_state(self):
+        path, tm = _make_manager()
+        tm.set_tasks([_task_dict(id="1")])
+        (path / "tasks.json").write_text("{}")
+        tm.save_tasks(force=True)
+        assert TaskManager(path).tasks[0].id == "1"
+
+    def test_write_leaves_no_temp_file(self):
+        path, tm = _make_manager()
+        tm.set_tasks([_task_dict(id="1")])
+        assert sorted(p.name for p in path.iterdir()) == ["tasks.json"]
+
 
 class TestGetNextTask:
     def test_returns_pending_task(self):
@@ -129,6 +163,30 @@ class TestGetNextTask:
         _, tm = _make_manager(data)
         assert tm.get_next_task().id == "2"
 
+    def test_advances_as_tasks_complete(self):
+        data = [_task_dict(id=str(i)) for i in range(1, 4)]
+        _, tm = _make_manager(data)
+        tm.update_task_status("1", "completed")
+        tm.record_task_failure("2", "boom")
+        assert tm.get_next_task().id == "3"
+        tm.update_task_status("3", "completed")
+        assert tm.get_next_task() is None
+
+    def test_reactivated_task_keeps_its_position(self):
+        data = [_task_dict(id="1"), _task_dict(id="2")]
+        _, tm = _make_manager(data)
+        tm.update_task_status("1", "completed")
+        assert tm.get_next_task().id == "2"
+        tm.update_task_status("1", "pending")
+        assert tm.get_next_task().id == "1"
+
+    def test_sees_added_and_replaced_tasks(self):
+        _, tm = _make_manager([_task_dict(id="1", status="completed")])
+        tm.add_task(SubTask(id="2", title="T2", description="D2", test_command="echo 2"))
+        assert tm.get_next_task().id == "2"
+        tm.set_tasks([_task_dict(id="3")])
+        assert tm.get_next_task().id == "3"
+
 
 class TestUpdateTaskStatus:
     def test_updates_status(self):
@@ -136,6 +194,12 @@ class TestUpdateTaskStatus:
         tm.update_task_status("1", "completed")
         assert tm.tasks[0].status == "completed"
 
+    def test_records_utc_timestamp(self):
+        _, tm = _make_manager([_task_dict(id="1", status="pending")])
+        tm.update_task_status("1", "completed")
+        stamp = datetime.fromisoformat(tm.tasks[0].updated_time)
+        assert stamp.utcoffset() == timedelta(0)
+
     def test_sets_updated_time(self):
         _, tm = _make_manager([_task_dict(id="1")])
         assert tm.tasks[0].updated_time is None
@@ -1,11 +1,24 @@
+import functools
 import re
 import subprocess
 from pathlib import Path
 from typing import Optional, Dict, List
 
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
+_HEADER_RE = re.compile(r'^(\w+)(?:\((\w+)\))?: (.+)$')
+_BREAKING_FOOTER_RE = re.compile(r'^\s*BREAKING CHANGE:', re.M)
+# Substring match, so 'removed' and 'deprecated' count too ('remove feature' is covered by 'remove')
+_BREAKING_KEYWORD_RE = re.compile(r'breaking|incompatible|remove|delete|deprecate', re.I)
+
 class ConventionalCommitGenerator:
     def __init__(self, project_dir: Optional[Path] = None):
         self.project_dir = project_dir or Path.cwd()
+        self._repo = None
         self.commit_types = {
             'feat': 'A new feature',
             'fix': 'A bug fix',
@@ -31,8 +44,34 @@ class ConventionalCommitGenerator:
             'ci': ['ci', 'cd', 'github actions', 'gitlab ci', 'workflow', 'pipeline', 'deploy'],
             'chore': ['chore', 'update', 'upgrade', 'maintenance', 'config', 'settings', 'version']
         }
+        # Keyword -> every type listing it ('optimize' scores for both refactor and perf)
+        self._keyword_types: Dict[str, List[str]] = {}
+        for commit_type, kws in self.type_keywords.items():
+            for kw in kws:
+                self._keyword_types.setdefault(kw, []).append(commit_type)
+
+    def _staged_diff(self):
+        # Read the staged diff in-process with libgit2; None means fall back to the git CLI
+        if not PYGIT2_AVAILABLE:
+            return None
+        try:
+            if self._repo is None:
+                self._repo = pygit2.Repository(str(self.project_dir))
+            if self._repo.head_is_unborn:
+                return None
+            index = self._repo.index
+            index.read()
+            diff = index.diff_to_tree(self._repo.head.peel(pygit2.Tree))
+            # git diff reports renames by default; match it
+            diff.find_similar()
+            return diff
+        except (pygit2.GitError, KeyError, ValueError):
+            return None
 
     def get_git_diff(self) -> str:
+        diff = self._staged_diff()
+        if diff is not None:
+            return diff.patch or ""
         try:
             result = subprocess.run(
                 ['git', 'diff', '--staged'],
@@ -45,14 +84,18 @@ class ConventionalCommitGenerator:
             return ""
 
     def get_changed_files(self) -> List[str]:
+        diff = self._staged_diff()
+        if diff is not None:
+            return [delta.new_file.path for delta in diff.deltas]
         try:
+            # -z keeps paths unquoted, so non-ASCII names come through intact
             result = subprocess.run(
-                ['git', 'diff', '--staged', '--name-only'],
+                ['git', 'diff', '--staged', '--name-only', '-z'],
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir
             )
-            return result.stdout.strip().split('\n') if result.stdout.strip() else []
+            return [path for path in result.stdout.split('\0') if path]
         except Exception:
             return []
 
@@ -60,30 +103,27 @@ class ConventionalCommitGenerator:
         if not changed_files:
             return ""
         
-        common_prefixes = []
+        counts: Dict[str, int] = {}
         for file in changed_files:
-            parts = file.split('/')
-            if len(parts) > 1:
-                common_prefixes.append(parts[0])
+            top_dir, sep, _ = file.partition('/')
+            if sep:
+                counts[top_dir] = counts.get(top_dir, 0) + 1
         
-        if common_prefixes:
-            from collections import Counter
-            most_common = Counter(common_prefixes).most_common(1)
-            if most_common:
-                return most_common[0][0]
+        if counts:
+            # max() keeps the first directory seen among ties, as Counter.most_common did
+            return max(counts, key=counts.get)
         
         return ""
 
     def detect_commit_type(self, description: str, changed_files: List[str]) -> str:
         description_lower = description.lower()
         
-        type_scores = {}
-        for commit_type, keywords in self.type_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in description_lower:
-                    score += 1
-            type_scores[commit_type] = score
+        # Seeded in type_keywords order so ties still go to the type listed first
+        type_scores = dict.fromkeys(self.type_keywords, 0)
+        for keyword, commit_types in self._keyword_types.items():
+            if keyword in description_lower:
+                for commit_type in commit_types:
+                    type_scores[commit_type] += 1
         
         max_score = max(type_scores.values())
         if max_score > 0:
@@ -94,8 +134,7 @@ class ConventionalCommitGenerator:
         return "chore"
 
     def detect_breaking_change(self, description: str) -> bool:
-        breaking_keywords = ['breaking', 'incompatible', 'remove', 'delete', 'deprecate', 'remove feature']
-        return any(keyword in description.lower() for keyword in breaking_keywords)
+        return bool(_BREAKING_KEYWORD_RE.search(description))
 
     def format_commit_message(
         self,
@@ -106,13 +145,13 @@ class ConventionalCommitGenerator:
         breaking_change: bool = False,
         breaking_description: Optional[str] = None
     ) -> str:
-        if commit_type is None:
+        if commit_type is None or scope is None:
+            # One git call serves both type detection and scope inference
             changed_files = self.get_changed_files()
-            commit_type = self.detect_commit_type(description, changed_files)
-        
-        if scope is None:
-            changed_files = self.get_changed_files()
-            scope = self.infer_scope(changed_files)
+            if commit_type is None:
+                commit_type = self.detect_commit_type(description, changed_files)
+            if scope is None:
+                scope = self.infer_scope(changed_files)
         
         subject = description.strip()
         if commit_type:
@@ -141,7 +180,6 @@ class ConventionalCommitGenerator:
         return self.format_commit_message(description)
 
     def generate_from_changes(self, changes_description: str) -> str:
-        diff = self.get_git_diff()
         changed_files = self.get_changed_files()
         
         commit_type = self.detect_commit_type(changes_description, changed_files)
@@ -171,8 +209,7 @@ class ConventionalCommitGenerator:
         if not lines:
             return result
         
-        header_pattern = r'^(\w+)(?:\((\w+)\))?: (.+)$'
-        match = re.match(header_pattern, lines[0])
+        match = _HEADER_RE.match(lines[0])
         
         if match:
             result["is_valid"] = True
@@ -192,10 +229,9 @@ class ConventionalCommitGenerator:
             if len(lines) > 1 and lines[1] != "":
                 result["body"] = "\n".join(lines[2:])
             
-            for i, line in enumerate(lines):
-                if line.strip().startswith("BREAKING CHANGE:"):
-                    result["breaking_change"] = True
-                    break
+            # The header has already matched, so only the lines after it can hold the footer
+            if len(lines) > 1:
+                result["breaking_change"] = bool(_BREAKING_FOOTER_RE.search(commit_message, len(lines[0]) + 1))
         
         else:
             result["suggestions"].append("Commit message does not follow conventional commits format.")
@@ -203,6 +239,11 @@ class ConventionalCommitGenerator:
         
         return result
 
+@functools.lru_cache(maxsize=8)
+def _get_generator(project_dir: Path) -> ConventionalCommitGenerator:
+    # Keyed by directory so helpers keep following the current working directory
+    return ConventionalCommitGenerator(project_dir)
+
 def conventional_commits(description: str, scope: Optional[str] = None, breaking_change: bool = False, breaking_description: Optional[str] = None) -> str:
     """
     Generate a conventional commit message from a natural language description.
@@ -216,7 +257,7 @@ def conventional_commits(description: str, scope: Optional[str] = None, breaking
     Returns:
         Formatted conventional commit message
     """
-    generator = ConventionalCommitGenerator()
+    generator = _get_generator(Path.cwd())
     return generator.format_commit_message(
         description=description,
         scope=scope,
@@ -234,7 +275,7 @@ def review_conventional_commit(commit_message: str) -> Dict[str, any]:
     Returns:
         Dictionary with review results including validity and suggestions
     """
-    generator = ConventionalCommitGenerator()
+    generator = _get_generator(Path.cwd())
     return generator.review_commit_message(commit_message)
 
 if __name__ == "__main__":
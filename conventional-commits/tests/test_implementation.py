@@ -0,0 +1,252 @@
+"""Tests for ConventionalCommitGenerator."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import implementation
+from implementation import ConventionalCommitGenerator
+
+
+def _git(repo_dir, *args):
+    subprocess.run(["git", *args], cwd=repo_dir, check=True, capture_output=True)
+
+
+@pytest.fixture
+def staged_repo():
+    """A repository with one commit and a staged rename, delete, edit and non-ASCII add."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_dir = Path(tmpdir)
+        _git(repo_dir, "init", "-q")
+        _git(repo_dir, "config", "user.name", "Test")
+        _git(repo_dir, "config", "user.email", "test@example.com")
+        (repo_dir / "src").mkdir()
+        (repo_dir / "src" / "old_name.py").write_text("".join(f"line {i}\n" for i in range(20)))
+        (repo_dir / "src" / "gone.py").write_text("x = 1\n")
+        (repo_dir / "README.md").write_text("readme\n")
+        _git(repo_dir, "add", "-A")
+        _git(repo_dir, "commit", "-q", "-m", "Initial")
+
+        _git(repo_dir, "mv", "src/old_name.py", "src/new_name.py")
+        _git(repo_dir, "rm", "-q", "src/gone.py")
+        (repo_dir / "README.md").write_text("readme\nmore\n")
+        (repo_dir / "docs").mkdir()
+        (repo_dir / "docs" / "café.md").write_text("bonjour\n")
+        _git(repo_dir, "add", "-A")
+        yield repo_dir
+
+
+EXPECTED_FILES = ["README.md", "docs/café.md", "src/gone.py", "src/new_name.py"]
+
+
+# ---------------------------------------------------------------------------
+# Message formatting
+# ---------------------------------------------------------------------------
+
+class TestFormatCommitMessage:
+    def setup_method(self):
+        self.generator = ConventionalCommitGenerator(Path("."))
+
+    def test_one_file_list_serves_type_and_scope(self):
+        with patch.object(self.generator, "get_changed_files", return_value=["api/login.py"]) as changed:
+            message = self.generator.format_commit_message("Add login endpoint")
+        assert message == "feat(api): Add login endpoint"
+        changed.assert_called_once_with()
+
+    def test_explicit_type_and_scope_skip_git(self):
+        with patch.object(self.generator, "get_changed_files") as changed:
+            message = self.generator.format_commit_message("Fix typo", commit_type="fix", scope="ui")
+        assert message == "fix(ui): Fix typo"
+        changed.assert_not_called()
+
+    def test_generate_from_changes_does_not_read_diff(self):
+        with patch.object(self.generator, "get_git_diff") as diff, \
+                patch.object(self.generator, "get_changed_files", return_value=["api/v1.py"]) as changed:
+            message = self.generator.generate_from_changes("Remove the v1 endpoints")
+        diff.assert_not_called()
+        changed.assert_called_once_with()
+        assert message.startswith("chore(api): Remove the v1 endpoints\n\nBREAKING CHANGE:")
+
+    def test_breaking_change_footer(self):
+        message = self.generator.format_commit_message(
+            "Drop v1", commit_type="feat", scope="api",
+            breaking_change=True, breaking_description="v1 is gone"
+        )
+        assert message == "feat(api): Drop v1\n\nBREAKING CHANGE: v1 is gone"
+
+
+# ---------------------------------------------------------------------------
+# Type detection
+# ---------------------------------------------------------------------------
+
+class TestDetectCommitType:
+    def setup_method(self):
+        self.generator = ConventionalCommitGenerator(Path("."))
+
+    def test_highest_score_wins(self):
+        assert self.generator.detect_commit_type("Fix crash on broken input", []) == "fix"
+
+    def test_tie_goes_to_type_listed_first(self):
+        # 'add' scores feat, 'fix' scores fix; feat is listed first
+        assert self.generator.detect_commit_type("Add fix", []) == "feat"
+
+    def test_keywords_match_inside_words(self):
+        assert self.generator.detect_commit_type("Documented the parser", []) == "docs"
+
+    def test_no_keywords_is_chore(self):
+        assert self.generator.detect_commit_type("Misc", []) == "chore"
+
+    def test_shared_keyword_scores_every_type(self):
+        # 'optimize' is listed under both refactor and perf; refactor comes first
+        assert self.generator.detect_commit_type("Optimize", []) == "refactor"
+        assert self.generator.detect_commit_type("Optimize for speed", []) == "perf"
+
+
+# ---------------------------------------------------------------------------
+# Message review
+# ---------------------------------------------------------------------------
+
+class TestReviewCommitMessage:
+    def setup_method(self):
+        self.generator = ConventionalCommitGenerator(Path("."))
+
+    def test_parses_header(self):
+        result = self.generator.review_commit_message("feat(api): Add login")
+        assert result["is_valid"]
+        assert (result["type"], result["scope"], result["description"]) == ("feat", "api", "Add login")
+
+    def test_scope_is_optional(self):
+        result = self.generator.review_commit_message("fix: Handle empty input")
+        assert result["is_valid"]
+        assert result["scope"] is None
+
+    def test_unknown_type_is_flagged(self):
+        result = self.generator.review_commit_message("feature: Add login")
+        assert result["is_valid"]
+        assert "Type 'feature' is not a recognized commit type." in result["suggestions"]
+
+    def test_malformed_header(self):
+        result = self.generator.review_commit_message("Add login")
+        assert not result["is_valid"]
+        assert result["type"] is None
+
+    def test_footer_after_header_is_detected(self):
+        result = self.generator.review_commit_message(
+            "feat(api): Drop v1\n\nBody text\n\nBREAKING CHANGE: v1 is gone"
+        )
+        assert result["is_valid"]
+        assert result["breaking_change"]
+
+    def test_footer_directly_under_header_is_detected(self):
+        result = self.generator.review_commit_message("feat: Drop v1\nBREAKING CHANGE: v1 is gone")
+        assert result["breaking_change"]
+
+    def test_footer_text_in_header_is_ignored(self):
+        result = self.generator.review_commit_message("feat: BREAKING CHANGE: in subject")
+        assert result["is_valid"]
+        assert not result["breaking_change"]
+
+
+# ---------------------------------------------------------------------------
+# Scope inference
+# ---------------------------------------------------------------------------
+
+class TestInferScope:
+    def setup_method(self):
+        self.generator = ConventionalCommitGenerator(Path("."))
+
+    def test_most_common_top_dir(self):
+        assert self.generator.infer_scope(["api/a.py", "ui/b.py", "api/c.py", "setup.py"]) == "api"
+
+    def test_tie_goes_to_first_seen(self):
+        assert self.generator.infer_scope(["ui/a.py", "api/b.py"]) == "ui"
+
+    def test_no_directories(self):
+        assert self.generator.infer_scope(["setup.py"]) == ""
+        assert self.generator.infer_scope([]) == ""
+
+
+# ---------------------------------------------------------------------------
+# Module-level helpers
+# ---------------------------------------------------------------------------
+
+class TestModuleHelpers:
+    def test_helpers_reuse_one_generator_per_directory(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        implementation._get_generator.cache_clear()
+        with patch.object(implementation, "ConventionalCommitGenerator",
+                          wraps=ConventionalCommitGenerator) as generator_cls:
+            implementation.review_conventional_commit("feat: Add login")
+            implementation.review_conventional_commit("fix: Handle empty input")
+            implementation.conventional_commits("Add login", scope="api")
+        assert generator_cls.call_count == 1
+
+    def test_changing_directory_gets_a_new_generator(self, tmp_path, monkeypatch):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        implementation._get_generator.cache_clear()
+        with patch.object(implementation, "ConventionalCommitGenerator",
+                          wraps=ConventionalCommitGenerator) as generator_cls:
+            monkeypatch.chdir(tmp_path / "a")
+            implementation.review_conventional_commit("feat: Add login")
+            monkeypatch.chdir(tmp_path / "b")
+            implementation.review_conventional_commit("feat: Add login")
+        assert [call.args[0] for call in generator_cls.call_args_list] == [tmp_path / "a", tmp_path / "b"]
+
+
+# ---------------------------------------------------------------------------
+# Staged changes
+# ---------------------------------------------------------------------------
+
+class TestChangedFiles:
+    def test_pygit2_path(self, staged_repo):
+        pytest.importorskip("pygit2")
+        generator = ConventionalCommitGenerator(staged_repo)
+        assert generator._staged_diff() is not None
+        assert sorted(generator.get_changed_files()) == EXPECTED_FILES
+
+    def test_both_paths_agree_on_diff(self, staged_repo, monkeypatch):
+        pytest.importorskip("pygit2")
+        in_process = ConventionalCommitGenerator(staged_repo).get_git_diff()
+        monkeypatch.setattr(implementation, "PYGIT2_AVAILABLE", False)
+        cli = ConventionalCommitGenerator(staged_repo).get_git_diff()
+        for text in ("src/new_name.py", "src/gone.py", "+more"):
+            assert text in in_process
+            assert text in cli
+
+    def test_git_cli_fallback(self, staged_repo, monkeypatch):
+        monkeypatch.setattr(implementation, "PYGIT2_AVAILABLE", False)
+        generator = ConventionalCommitGenerator(staged_repo)
+        assert sorted(generator.get_changed_files()) == EXPECTED_FILES
+
+    def test_not_a_repository(self, monkeypatch):
+        monkeypatch.setattr(implementation, "PYGIT2_AVAILABLE", False)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert ConventionalCommitGenerator(Path(tmpdir)).get_changed_files() == []
+
+
+# ---------------------------------------------------------------------------
+# Breaking-change keywords
+# ---------------------------------------------------------------------------
+
+class TestDetectBreakingChange:
+    def setup_method(self):
+        self.generator = ConventionalCommitGenerator(Path("."))
+
+    def test_keywords_are_case_insensitive_substrings(self):
+        assert self.generator.detect_breaking_change("Removed the legacy API")
+        assert self.generator.detect_breaking_change("DEPRECATED old flags")
+        assert self.generator.detect_breaking_change("Incompatible config format")
+
+    def test_plain_description(self):
+        assert not self.generator.detect_breaking_change("Add login page")
@@ -12,7 +12,23 @@ import re
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
+
+# Prefer the libyaml-backed loader; PyYAML builds without libyaml only have the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Lowercase a-z, 0-9 and hyphens; no leading, trailing or consecutive hyphens
+_NAME_RE = re.compile(r'^[a-z0-9]+(-[a-z0-9]+)*$')
+# Deletes every allowed name character; anything left over is invalid
+_NAME_ALLOWED_CHARS = str.maketrans('', '', 'abcdefghijklmnopqrstuvwxyz0123456789-')
+# Fenced code, inline code, or a markdown link [text](path). Code spans are
+# matched so links inside them are skipped; only links capture groups.
+_MD_RE = re.compile(r'```.*?```|`[^`]+`|\[([^\]]+)\]\(([^)]+)\)', re.DOTALL)
+# Below this many local links a stat per link is cheaper than walking the skill
+_WALK_MIN_LINKS = 200
 
 # ANSI color codes for output
 class Colors:
@@ -45,12 +61,11 @@ def validate_name(name: str) -> Tuple[bool, List[str]]:
     
     # Check pattern: lowercase a-z, 0-9, hyphens only
     # No start/end hyphen, no consecutive hyphens
-    pattern = r'^[a-z0-9]+(-[a-z0-9]+)*$'
-    if not re.match(pattern, name):
+    if not _NAME_RE.match(name):
         # Provide specific error messages
         if not name.islower():
             errors.append("Name must be lowercase only")
-        if re.search(r'[^a-z0-9-]', name):
+        if name.translate(_NAME_ALLOWED_CHARS):
             errors.append("Name can only contain lowercase letters, numbers, and hyphens")
         if name.startswith('-'):
             errors.append("Name cannot start with a hyphen")
@@ -119,35 +134,40 @@ def parse_frontmatter(content: str) -> Tuple[Dict, str, List[str]]:
         errors.append("SKILL.md must start with YAML frontmatter delimited by '---'")
         return frontmatter, body, errors
     
-    # Find the end of frontmatter
-    parts = content.split('---', 2)
-    if len(parts) < 3:
+    # Find the end of frontmatter; slicing avoids splitting the whole document
+    end = content.find('---', 3)
+    if end == -1:
         errors.append("SKILL.md frontmatter not properly closed with '---'")
         return frontmatter, body, errors
     
     try:
-        frontmatter = yaml.safe_load(parts[1])
-        body = parts[2].lstrip('\n')
+        frontmatter = yaml.load(content[3:end], Loader=SafeLoader)
+        body = content[end + 3:].lstrip('\n')
     except yaml.YAMLError as e:
         errors.append(f"Invalid YAML in frontmatter: {e}")
     
     return frontmatter, body, errors
 
+def list_skill_paths(skill_path: Path) -> Set[str]:
+    """Collect every file and directory under the skill as normalized relative paths."""
+    known = {'.'}
+    for root, dirs, files in os.walk(skill_path):
+        rel_root = os.path.relpath(root, skill_path)
+        for name in dirs + files:
+            known.add(os.path.normpath(os.path.join(rel_root, name)))
+    return known
+
 def check_file_references(body: str, skill_path: Path) -> List[str]:
     """Check if file references are valid."""
     errors = []
     
-    # Remove code blocks from body (inline and multi-line)
-    # Remove inline code: `code`
-    body_no_inline = re.sub(r'`[^`]+`', '', body)
-    # Remove multi-line code blocks: ```code```
-    body_no_blocks = re.sub(r'```[^`]*```', '', body_no_inline, flags=re.DOTALL)
+    # Find markdown links outside code: [text](path)
+    paths = [match.group(2) for match in _MD_RE.finditer(body) if match.group(2) is not None]
     
-    # Find markdown links: [text](path)
-    link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-    for match in re.finditer(link_pattern, body_no_blocks):
-        path = match.group(2)
-        
+    # Many links share one walk of the skill; a few are cheaper to stat one by one
+    known = list_skill_paths(skill_path) if len(paths) >= _WALK_MIN_LINKS else set()
+    
+    for path in paths:
         # Skip absolute paths
         if path.startswith('/'):
             errors.append(f"Absolute path found: {path}. Use relative paths from skill root.")
@@ -157,21 +177,11 @@ def check_file_references(body: str, skill_path: Path) -> List[str]:
         if path.startswith('http://') or path.startswith('https://'):
             continue
         
-        # Check if referenced file exists
-        ref_path = skill_path / path
-        if not ref_path.exists():
+        # Check if referenced file exists. Misses are confirmed on disk, since
+        # the walk does not enter symlinked directories.
+        if os.path.normpath(path) not in known and not (skill_path / path).exists():
             errors.append(f"Referenced file not found: {path}")
     
-    # Find code references: `path/to/file`
-    code_pattern = r'`([a-zA-Z0-9_\-./]+\.[a-zA-Z0-9]+)`'
-    for match in re.finditer(code_pattern, body):
-        path = match.group(1)
-        if '/' in path:  # Only check paths that look like file references
-            ref_path = skill_path / path
-            if ref_path.exists():
-                # File exists, likely a valid reference
-                pass
-    
     return errors
 
 def validate_skill(skill_path: Path) -> bool:
@@ -0,0 +1,113 @@
+"""Tests for scripts/validate_skill.py."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import validate_skill
+from validate_skill import check_file_references, parse_frontmatter, validate_name
+
+
+@pytest.fixture
+def skill_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        skill_path = Path(tmpdir) / "my-skill"
+        (skill_path / "references").mkdir(parents=True)
+        (skill_path / "references" / "guide.md").write_text("guide")
+        yield skill_path
+
+
+# ---------------------------------------------------------------------------
+# File references
+# ---------------------------------------------------------------------------
+
+class TestCheckFileReferences:
+    def test_existing_and_missing_links(self, skill_dir):
+        body = "See [guide](references/guide.md) and [missing](references/missing.md)."
+        assert check_file_references(body, skill_dir) == ["Referenced file not found: references/missing.md"]
+
+    def test_links_inside_code_are_skipped(self, skill_dir):
+        body = "```\n[example](nope.md)\n```\nInline `[x](also-nope.md)` too."
+        assert check_file_references(body, skill_dir) == []
+
+    def test_absolute_and_external_links(self, skill_dir):
+        body = "[abs](/etc/passwd) [web](https://example.com/x.md)"
+        assert check_file_references(body, skill_dir) == [
+            "Absolute path found: /etc/passwd. Use relative paths from skill root."
+        ]
+
+    def test_directory_and_dot_segments(self, skill_dir):
+        body = "[dir](references) [dot](./references/../references/guide.md)"
+        assert check_file_references(body, skill_dir) == []
+
+    def test_many_links_use_one_walk(self, skill_dir, monkeypatch):
+        monkeypatch.setattr(validate_skill, "_WALK_MIN_LINKS", 2)
+        body = "[a](references/guide.md) [b](references/guide.md) [c](missing.md)"
+        assert check_file_references(body, skill_dir) == ["Referenced file not found: missing.md"]
+
+
+# ---------------------------------------------------------------------------
+# Frontmatter
+# ---------------------------------------------------------------------------
+
+class TestParseFrontmatter:
+    def test_splits_frontmatter_and_body(self):
+        content = "---\nname: my-skill\ndescription: Does things\n---\n\n# Title\n"
+        frontmatter, body, errors = parse_frontmatter(content)
+        assert errors == []
+        assert frontmatter == {"name": "my-skill", "description": "Does things"}
+        assert body == "# Title\n"
+
+    def test_later_rules_stay_in_body(self):
+        _, body, errors = parse_frontmatter("---\nname: a\n---\nText\n\n---\n\nMore\n")
+        assert errors == []
+        assert body == "Text\n\n---\n\nMore\n"
+
+    def test_missing_frontmatter(self):
+        _, _, errors = parse_frontmatter("# Title\n")
+        assert errors == ["SKILL.md must start with YAML frontmatter delimited by '---'"]
+
+    def test_unclosed_frontmatter(self):
+        _, _, errors = parse_frontmatter("---\nname: a\n")
+        assert errors == ["SKILL.md frontmatter not properly closed with '---'"]
+
+    def test_invalid_yaml(self):
+        _, _, errors = parse_frontmatter("---\nname: [a\n---\n")
+        assert len(errors) == 1
+        assert errors[0].startswith("Invalid YAML in frontmatter")
+
+    def test_uses_libyaml_loader_when_available(self):
+        assert validate_skill.SafeLoader is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# ---------------------------------------------------------------------------
+# Name validation
+# ---------------------------------------------------------------------------
+
+class TestValidateName:
+    def test_valid_names(self):
+        for name in ("a", "my-skill", "pdf2text", "a" * 64):
+            assert validate_name(name) == (True, [])
+
+    def test_hyphen_rules(self):
+        _, errors = validate_name("-a--b-")
+        assert "Name cannot start with a hyphen" in errors
+        assert "Name cannot end with a hyphen" in errors
+        assert "Name cannot contain consecutive hyphens" in errors
+
+    def test_invalid_characters(self):
+        valid, errors = validate_name("My_Skill")
+        assert not valid
+        assert "Name must be lowercase only" in errors
+        assert "Name can only contain lowercase letters, numbers, and hyphens" in errors
+
+    def test_too_long(self):
+        valid, errors = validate_name("a" * 65)
+        assert not valid
+        assert errors == ["Name must be 1-64 characters, got 65"]